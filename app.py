@@ -1,21 +1,39 @@
+import argparse
+import sys
 import time
+import profiling
+from config import BOARD_CAMERA_URL, STREAM_URL
 from robot.api_client import XArmAPIClient
 from robot.movement import initialize
 from game.game_state import GameState
-from game.game_logic import robot_turn, move_to_default_position
+from game.game_logic import console_confirm, console_log, reset_figure, robot_turn, move_to_default_position
+from game.prepositioning import IdlePreparer
+from game.motion_plans import eta_range, get_plan_cache
+from startup import boot, profile_startup, warm_camera, warm_tables
+from robot.calibration import CALIBRATION
+from vision.board_state import load_board_watcher, verify_positions
+from vision.pickup import load_dice_picker
 
 
 def main():
     client = XArmAPIClient()
-    token = login(client)
+    game_state = GameState()
+    dice_picker = load_dice_picker()
+    board_watcher = load_board_watcher(BOARD_CAMERA_URL, CALIBRATION, game_state.board)
+    
+    # The camera and the tables do not need the robot, so they get ready while it logs in
+    report = boot({
+        "robot": lambda: start_robot(client),
+        "camera": lambda: warm_camera(STREAM_URL, dice_picker),
+        "tables": lambda: warm_tables(game_state.board),
+    })
+    token = report.results.get("robot")
     
     if token is None:
         print("Failed to get token. Exiting...")
         return
     
-    initialize(client, token)
-    
-    game_state = GameState()
+    preparer = IdlePreparer(client, token)
     
     print("\n" + "="*50)
     print("WELCOME TO THE SNAKES AND LADDERS DICE GAME!")
@@ -46,6 +64,7 @@ def main():
             print("1. Roll your physical dice")
             print("2. Enter the value below")
             print("3. Move your character on the board")
+            preparer.start()
             
             try:
                 dice_value = int(input("\nHow many eyes did you roll? (1-6): "))
@@ -57,11 +76,13 @@ def main():
                     # Check if landing on robot's current field BEFORE moving
                     if target_field == old_robot_position and target_field < game_state.max_field:
                         print(f"\nCollision detected! You would land on field {target_field} where the robot is.")
-                        print("Please move the robot's character back to field 1 on the physical board.")
-                        input("Press ENTER when you have moved the robot's character to field 1...")
-                        game_state.robot_position = 1
+                        preparer.cancel()
+                        reset_figure(client, token, "robot", old_robot_position, old_position, console_log,
+                                     console_confirm, game_state.board, board_watcher)
+                        game_state.reset_robot_position()
                         print("Robot's character has been reset to field 1.")
                     
+                    robot_before_move = game_state.get_robot_position()
                     new_position = game_state.move_player(dice_value)
                     
                     # Handle collision return (None means collision that wasn't pre-handled)
@@ -70,6 +91,13 @@ def main():
                         print("Unexpected collision state. Skipping turn.")
                         continue
                     
+                    # A ladder or snake ending on the robot's field sends the robot home as well
+                    if game_state.get_robot_position() != robot_before_move:
+                        preparer.cancel()
+                        reset_figure(client, token, "robot", robot_before_move, old_position, console_log,
+                                     console_confirm, game_state.board, board_watcher)
+                        print("Robot's character has been reset to field 1.")
+                    
                     if old_position != new_position:
                         print(f"\nYou moved from field {old_position} to field {new_position}!")
                         print("Please move your character on the physical board.")
@@ -86,17 +114,26 @@ def main():
                 print("\n\nGame interrupted by user.")
                 break
             
+            # Plan every possible robot move while waiting for the player
+            eta = eta_range(get_plan_cache().prebuild(game_state.get_robot_position(),
+                                                      game_state.get_player_position(), game_state.max_field))
+            if eta is not None:
+                print(f"The robot's figure move will take about {eta[0]:.0f}-{eta[1]:.0f}s.")
+            
             input("\nPress ENTER when you're ready for the robot's turn...")
+            verify_positions(board_watcher, game_state, console_log)
             game_state.switch_turn()
             
         else:
-            if not robot_turn(client, token, game_state):
+            if not robot_turn(client, token, game_state, preparer=preparer, dice_picker=dice_picker,
+                              board_watcher=board_watcher):
                 print("Robot turn failed. Ending game.")
                 break
             
             if not game_state.is_game_over():
                 game_state.switch_turn()
     
+    preparer.cancel(return_home=False)
     print("\n" + "="*50)
     print("GAME OVER!")
     print("="*50)
@@ -111,12 +148,21 @@ def main():
     print(f"  Robot: Field {game_state.get_robot_position()}")
     print("="*50 + "\n")
     
+    print(profiling.format_summary() + "\n")
+    
     print("Returning robot to default position...")
     move_to_default_position(client, token)
     
     print("\nThank you for playing!")
 
 
+def start_robot(client):
+    token = login(client)
+    if token is not None:
+        initialize(client, token)
+    return token
+
+
 def login(client):
     operator_info = client.get_operator_info()
     
@@ -140,4 +186,10 @@ def login(client):
 
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Play Snakes and Ladders against the xArm7 on the command line")
+    parser.add_argument("--profile-startup", action="store_true",
+                        help="Report where the import time goes and exit")
+    args = parser.parse_args()
+    if args.profile_startup:
+        sys.exit(0 if profile_startup("app") else 1)
     main()
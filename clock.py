@@ -0,0 +1,84 @@
+import threading
+import time
+
+
+class RealClock:
+    """Wall-clock time; what the game uses against the real robot."""
+
+    def now(self):
+        """Monotonic seconds for measuring durations."""
+        return time.perf_counter()
+
+    def time(self):
+        """Seconds since the epoch for timestamps."""
+        return time.time()
+
+    def sleep(self, seconds):
+        time.sleep(seconds)
+
+    def wait(self, event, timeout):
+        """Wait for a threading.Event like event.wait(timeout)."""
+        return event.wait(timeout)
+
+
+class VirtualClock:
+    """A clock whose sleeps return at once and only move its own time forward.
+
+    Simulated games run against it as fast as the code executes, while every
+    duration the turn profiles and metrics record is still the time the game
+    would have taken on the real robot.
+    """
+
+    def __init__(self, start=0.0, epoch=None):
+        self._now = start
+        self._epoch = time.time() if epoch is None else epoch
+        self._lock = threading.Lock()
+
+    def now(self):
+        return self._now
+
+    def time(self):
+        return self._epoch + self._now
+
+    def sleep(self, seconds):
+        self.advance(seconds)
+
+    def advance(self, seconds):
+        if seconds > 0:
+            with self._lock:
+                self._now += seconds
+
+    def wait(self, event, timeout):
+        if not event.is_set() and timeout is not None:
+            self.advance(timeout)
+        return event.is_set()
+
+
+_clock = RealClock()
+
+
+def get_clock():
+    return _clock
+
+
+def set_clock(clock):
+    """Replace the process-wide clock and return the previous one."""
+    global _clock
+    previous, _clock = _clock, clock
+    return previous
+
+
+def now():
+    return _clock.now()
+
+
+def wall_time():
+    return _clock.time()
+
+
+def sleep(seconds):
+    _clock.sleep(seconds)
+
+
+def wait(event, timeout):
+    return _clock.wait(event, timeout)
@@ -1,82 +1,122 @@
+import os
+
 GAME_CONFIG = {
-    "default_position": {
-        "x": 500,
-        "y": 0,
-        "z": 230,
-        "roll": 0,
-        "pitch": -180,
-        "yaw": 180,
-        "speed": 50
-    },
-    
-    "dice_position_up": {
-        "x": 500,
-        "y": 200,
-        "z": 300,
-        "roll": 0,
-        "pitch": -180,
-        "yaw": 180,
-        "speed": 50
-    },
-    
-    "dice_position_down": {
-        "x": 500,
-        "y": 200,
-        "z": 180,
-        "roll": 0,
-        "pitch": -180,
-        "yaw": 180,
-        "speed": 50
-    },
-    
-    "dice_throw_position": {
-        "x": 550,
-        "y": 250,
-        "z": 300,
-        "roll": 45,
-        "pitch": -135,
-        "yaw": 180,
-        "speed": 50
+    # The arm's poses and the board's position are measured per station and kept in
+    # CALIBRATION_FILE; only the game rules of the board live here
+    "board": {
+        "board_map": {
+            # Ladders (Upward movement)
+            3: 7,
+            11: 19,
+            15: 23,
+
+            # Snakes (Downward movement)
+            29: 20,
+            27: 16,
+            18: 10,
+            6: 4,
+        },
     },
     
-    "game_fields": [
-        {"field": 1, "up": {"x": 433, "y": 86, "z": 230, "roll": 0, "pitch": -180, "yaw": 180, "speed": 50}, "down": {"x": 433, "y": 86, "z": 180, "roll": 0, "pitch": -180, "yaw": 180, "speed": 50}},
-        {"field": 2, "up": {"x": 433, "y": 43, "z": 230, "roll": 0, "pitch": -180, "yaw": 180, "speed": 50}, "down": {"x": 433, "y": 43, "z": 180, "roll": 0, "pitch": -180, "yaw": 180, "speed": 50}},
-        {"field": 3, "up": {"x": 433, "y": 0, "z": 230, "roll": 0, "pitch": -180, "yaw": 180, "speed": 50}, "down": {"x": 433, "y": 0, "z": 180, "roll": 0, "pitch": -180, "yaw": 180, "speed": 50}},
-        {"field": 4, "up": {"x": 433, "y": -43, "z": 230, "roll": 0, "pitch": -180, "yaw": 180, "speed": 50}, "down": {"x": 433, "y": -43, "z": 180, "roll": 0, "pitch": -180, "yaw": 180, "speed": 50}},
-        {"field": 5, "up": {"x": 433, "y": -86, "z": 230, "roll": 0, "pitch": -180, "yaw": 180, "speed": 50}, "down": {"x": 433, "y": -86, "z": 180, "roll": 0, "pitch": -180, "yaw": 180, "speed": 50}},
-        {"field": 6, "up": {"x": 476, "y": -86, "z": 230, "roll": 0, "pitch": -180, "yaw": 180, "speed": 50}, "down": {"x": 476, "y": -86, "z": 180, "roll": 0, "pitch": -180, "yaw": 180, "speed": 50}},
-        {"field": 7, "up": {"x": 476, "y": -43, "z": 230, "roll": 0, "pitch": -180, "yaw": 180, "speed": 50}, "down": {"x": 476, "y": -43, "z": 180, "roll": 0, "pitch": -180, "yaw": 180, "speed": 50}},
-        {"field": 8, "up": {"x": 476, "y": 0, "z": 230, "roll": 0, "pitch": -180, "yaw": 180, "speed": 50}, "down": {"x": 476, "y": 0, "z": 180, "roll": 0, "pitch": -180, "yaw": 180, "speed": 50}},
-        {"field": 9, "up": {"x": 476, "y": 43, "z": 230, "roll": 0, "pitch": -180, "yaw": 180, "speed": 50}, "down": {"x": 476, "y": 43, "z": 180, "roll": 0, "pitch": -180, "yaw": 180, "speed": 50}},
-        {"field": 10, "up": {"x": 476, "y": 86, "z": 230, "roll": 0, "pitch": -180, "yaw": 180, "speed": 50}, "down": {"x": 476, "y": 86, "z": 180, "roll": 0, "pitch": -180, "yaw": 180, "speed": 50}},
-        {"field": 11, "up": {"x": 519, "y": 86, "z": 230, "roll": 0, "pitch": -180, "yaw": 180, "speed": 50}, "down": {"x": 519, "y": 86, "z": 180, "roll": 0, "pitch": -180, "yaw": 180, "speed": 50}},
-        {"field": 12, "up": {"x": 519, "y": 43, "z": 230, "roll": 0, "pitch": -180, "yaw": 180, "speed": 50}, "down": {"x": 519, "y": 43, "z": 180, "roll": 0, "pitch": -180, "yaw": 180, "speed": 50}},
-        {"field": 13, "up": {"x": 519, "y": 0, "z": 230, "roll": 0, "pitch": -180, "yaw": 180, "speed": 50}, "down": {"x": 519, "y": 0, "z": 180, "roll": 0, "pitch": -180, "yaw": 180, "speed": 50}},
-        {"field": 14, "up": {"x": 519, "y": -43, "z": 230, "roll": 0, "pitch": -180, "yaw": 180, "speed": 50}, "down": {"x": 519, "y": -43, "z": 180, "roll": 0, "pitch": -180, "yaw": 180, "speed": 50}},
-        {"field": 15, "up": {"x": 519, "y": -86, "z": 230, "roll": 0, "pitch": -180, "yaw": 180, "speed": 50}, "down": {"x": 519, "y": -86, "z": 180, "roll": 0, "pitch": -180, "yaw": 180, "speed": 50}},
-        {"field": 16, "up": {"x": 562, "y": -86, "z": 230, "roll": 0, "pitch": -180, "yaw": 180, "speed": 50}, "down": {"x": 562, "y": -86, "z": 180, "roll": 0, "pitch": -180, "yaw": 180, "speed": 50}},
-        {"field": 17, "up": {"x": 562, "y": -43, "z": 230, "roll": 0, "pitch": -180, "yaw": 180, "speed": 50}, "down": {"x": 562, "y": -43, "z": 180, "roll": 0, "pitch": -180, "yaw": 180, "speed": 50}},
-        {"field": 18, "up": {"x": 562, "y": 0, "z": 230, "roll": 0, "pitch": -180, "yaw": 180, "speed": 50}, "down": {"x": 562, "y": 0, "z": 180, "roll": 0, "pitch": -180, "yaw": 180, "speed": 50}},
-        {"field": 19, "up": {"x": 562, "y": 43, "z": 230, "roll": 0, "pitch": -180, "yaw": 180, "speed": 50}, "down": {"x": 562, "y": 43, "z": 180, "roll": 0, "pitch": -180, "yaw": 180, "speed": 50}},
-        {"field": 20, "up": {"x": 562, "y": 86, "z": 230, "roll": 0, "pitch": -180, "yaw": 180, "speed": 50}, "down": {"x": 562, "y": 86, "z": 180, "roll": 0, "pitch": -180, "yaw": 180, "speed": 50}},
-        {"field": 21, "up": {"x": 602, "y": 86, "z": 230, "roll": 0, "pitch": -180, "yaw": 180, "speed": 50}, "down": {"x": 602, "y": 86, "z": 180, "roll": 0, "pitch": -180, "yaw": 180, "speed": 50}},
-        {"field": 22, "up": {"x": 602, "y": 43, "z": 230, "roll": 0, "pitch": -180, "yaw": 180, "speed": 50}, "down": {"x": 602, "y": 43, "z": 180, "roll": 0, "pitch": -180, "yaw": 180, "speed": 50}},
-        {"field": 23, "up": {"x": 602, "y": 0, "z": 230, "roll": 0, "pitch": -180, "yaw": 180, "speed": 50}, "down": {"x": 602, "y": 0, "z": 180, "roll": 0, "pitch": -180, "yaw": 180, "speed": 50}},
-        {"field": 24, "up": {"x": 602, "y": -43, "z": 230, "roll": 0, "pitch": -180, "yaw": 180, "speed": 50}, "down": {"x": 602, "y": -43, "z": 180, "roll": 0, "pitch": -180, "yaw": 180, "speed": 50}},
-        {"field": 25, "up": {"x": 602, "y": -86, "z": 230, "roll": 0, "pitch": -180, "yaw": 180, "speed": 50}, "down": {"x": 602, "y": -86, "z": 180, "roll": 0, "pitch": -180, "yaw": 180, "speed": 50}},
-        {"field": 26, "up": {"x": 645, "y": -86, "z": 230, "roll": 0, "pitch": -180, "yaw": 180, "speed": 50}, "down": {"x": 645, "y": -86, "z": 180, "roll": 0, "pitch": -180, "yaw": 180, "speed": 50}},
-        {"field": 27, "up": {"x": 645, "y": -43, "z": 230, "roll": 0, "pitch": -180, "yaw": 180, "speed": 50}, "down": {"x": 645, "y": -43, "z": 180, "roll": 0, "pitch": -180, "yaw": 180, "speed": 50}},
-        {"field": 28, "up": {"x": 645, "y": 0, "z": 230, "roll": 0, "pitch": -180, "yaw": 180, "speed": 50}, "down": {"x": 645, "y": 0, "z": 180, "roll": 0, "pitch": -180, "yaw": 180, "speed": 50}},
-        {"field": 29, "up": {"x": 645, "y": 43, "z": 230, "roll": 0, "pitch": -180, "yaw": 180, "speed": 50}, "down": {"x": 645, "y": 43, "z": 180, "roll": 0, "pitch": -180, "yaw": 180, "speed": 50}},
-        {"field": 30, "up": {"x": 645, "y": 86, "z": 230, "roll": 0, "pitch": -180, "yaw": 180, "speed": 50}, "down": {"x": 645, "y": 86, "z": 180, "roll": 0, "pitch": -180, "yaw": 180, "speed": 50}},
-    ],
-    
     "gripper_open": 800,
     "gripper_closed_dice": 570,
-    "gripper_closed_figur": 250
+    "gripper_closed_figur": 250,
+    
+    # Grasp verification: a closed gripper that settles within empty_tolerance of the
+    # commanded value has nothing between its fingers
+    "gripper_feedback": {
+        "poll_interval": 0.2,
+        "timeout": 3,
+        "stable_delta": 5,
+        "empty_tolerance": 15,
+        "retries": 2,
+    }
+}
+
+# Measured poses and board geometry, loaded and validated by robot.calibration.
+# Board: field 1 corner at origin, rows advance along x, columns along -y;
+# row_offsets are the measured corrections per row, see the notes at the end of this file.
+CALIBRATION_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "calibration.json")
+
+# Every calibrated pose must lie within these bounds (mm and degrees)
+WORKSPACE_LIMITS = {
+    "x": (250, 800),
+    "y": (-400, 400),
+    "z": (120, 450),
+    "roll": (-180, 180),
+    "pitch": (-180, 180),
+    "yaw": (-180, 180),
+    "speed": (1, 200),
 }
 
+# Reference fields measured by robot.calibrate and the largest fit error (mm) it accepts
+CALIBRATION_REFERENCE_FIELDS = [1, 5, 26, 30]
+CALIBRATION_MAX_RESIDUAL = 3.0
+
+# Where the arm may pick up the dice after a throw (mm); a dice seen elsewhere is left to a human
+DICE_PICK_AREA = {"x": (430, 700), "y": (120, 380)}
+
+# At boot the camera calibration must locate the dice at its start position within this many mm
+DICE_PICK_TOLERANCE = 15
+
+# Who puts a figure sent home by a collision back on field 1: "robot" carries it with the arm
+# (a human still steps in if that fails), "human" always asks for it to be done by hand
+COLLISION_RESET = "robot"
+
+# Dice camera stream of the default station
+STREAM_URL = "https://interactions.ics.unisg.ch/61-102/cam2/live-stream"
+
+# Camera looking down on the board, used to check where the figures stand; None turns the checks off
+BOARD_CAMERA_URL = None
+
+# HSV ranges (lower, upper) of the figures as the board camera sees them
+FIGURE_HSV_RANGES = {
+    "robot": ([100, 120, 60], [130, 255, 255]),
+    "player": ([40, 80, 60], [80, 255, 255]),
+}
+
+# How long the board camera may take to see a figure put in place before a human is asked (s),
+# and how long it gets to check the board after a move
+BOARD_CONFIRM_TIMEOUT = 20
+BOARD_VERIFY_TIMEOUT = 5
+
+# Per-turn Chrome trace files are written here; set to None to keep them in memory only
+PROFILE_DIR = "profiles"
+
+# Precomputed figure motion plans are kept here between games; set to None to keep them in memory only
+MOTION_PLAN_FILE = "motion_plans.json"
+
+# Append-only record of the running web game, used to resume it after a crash.
+# Each station writes its own file, named after the station.
+JOURNAL_FILE = "game_journal.jsonl"
+
+# Robot stations the web server runs games on, one game per station at a time.
+# Each has its own arm API, dice camera and calibration file.
+STATIONS = [
+    {
+        "name": "station-1",
+        "base_url": "https://api.interactions.ics.unisg.ch/cherrybot/",
+        "camera_url": STREAM_URL,
+        "board_camera_url": BOARD_CAMERA_URL,
+        "calibration": CALIBRATION_FILE,
+    },
+]
+
+# How long a web game waits for its player's dice or confirmation (s) before it ends and frees the station
+PLAYER_IDLE_TIMEOUT = 600
+
+# Finished web games kept around so their players can still reconnect and see the result
+MAX_FINISHED_SESSIONS = 20
+
+# Import time (s) the CLI and frontend may spend before they reach the robot; checked by --profile-startup
+STARTUP_IMPORT_BUDGET = 0.5
+
+# Modules only needed from the first robot turn on, imported in the background during login and initialize
+WARM_MODULES = ["vision.dice_detector"]
+
+# On resume the arm counts as ready if it is this close (mm) to the default position
+RESUME_TCP_TOLERANCE = 5
+
 
 """
 Initialized:
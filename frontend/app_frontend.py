@@ -1,228 +1,347 @@
-from flask import Flask, render_template, request, jsonify
+from flask import Flask, Response, render_template, request, jsonify
 from flask_sock import Sock
-import threading
-import time
-import json
 
-app = Flask(__name__, 
+app = Flask(__name__,
             template_folder='templates',
             static_folder='static')
 sock = Sock(app)
 
 from robot.api_client import XArmAPIClient
-from robot.movement import initialize
+from robot.movement import initialize, is_at_default_position
 from game.game_state import GameState
-from game.game_logic_frontend import robot_turn, move_to_default_position, set_log_callback, set_collision_callback
+from game.journal import GameJournal
+from frontend.sessions import GameAbandoned, StationPool
+import clock
+import profiling
+from metrics import (REGISTRY, SESSIONS_QUEUED, STATIONS_BUSY, WS_CLIENTS, WS_QUEUE_DEPTH,
+                     record_game_completed)
+from game.game_logic import TurnPorts, reset_figure, robot_turn, move_to_default_position
+from game.prepositioning import IdlePreparer
+from game.motion_plans import eta_range, get_plan_cache
+from startup import boot, warm_camera, warm_tables
+from robot.gripper import release_object
+from vision.board_state import confirm_move, verify_positions
 
-game_state = None
-client = None
-token = None
-ws_clients = []
-game_lock = threading.Lock()
-waiting_for_input = threading.Event()
-user_dice_value = None
-collision_confirmed = threading.Event()
 
-
-def broadcast(message):
-    dead_clients = []
-    for ws in ws_clients:
-        try:
-            ws.send(json.dumps(message))
-        except:
-            dead_clients.append(ws)
-    
-    for ws in dead_clients:
-        ws_clients.remove(ws)
-
-
-def send_log(message, category='system'):
-    broadcast({'type': 'log', 'message': message, 'category': category})
-
-
-def send_state_update():
-    if game_state:
-        broadcast({
-            'type': 'state_update',
-            'player_position': game_state.get_player_position(),
-            'robot_position': game_state.get_robot_position()
-        })
-
-
-def handle_collision(message):
-    send_log(message, 'system')
-    broadcast({
-        'type': 'collision_prompt',
-        'message': message
-    })
-    collision_confirmed.clear()
-    collision_confirmed.wait()
-
-
-def login_robot(client_instance):
+def login_robot(client_instance, session):
     operator_info = client_instance.get_operator_info()
-    
+
     if operator_info is not None:
         name, email, token = operator_info
-        send_log(f"Found existing operator: {name} ({email})")
-        send_log("Deleting existing operator...")
+        session.send_log(f"Found existing operator: {name} ({email})")
+        session.send_log("Deleting existing operator...")
         if client_instance.delete_operator(token):
-            send_log("Existing operator deleted successfully.")
+            session.send_log("Existing operator deleted successfully.")
         else:
-            send_log("Failed to delete existing operator.")
-    
-    send_log("Registering new operator...")
+            session.send_log("Failed to delete existing operator.")
+
+    session.send_log("Registering new operator...")
     token = client_instance.register_operator("snake.exe", "snake@mail.com")
     if token is None:
-        send_log("Failed to register operator.")
+        session.send_log("Failed to register operator.")
+        return None
+    session.send_log(f"Successfully registered operator.")
+    return token
+
+
+def reuse_session(client_instance, session, previous_token):
+    """Return the token of the interrupted game if that operator is still registered."""
+    if previous_token is None:
+        return None
+    operator_info = client_instance.get_operator_info()
+    if operator_info is None or operator_info[2] != previous_token:
+        return None
+    session.send_log("Reusing the robot session of the interrupted game.")
+    return previous_token
+
+
+def connect_robot(client_instance, session, poses, resume_point=None):
+    """Log in (or take over the interrupted game's session) and bring the arm to its default position."""
+    token = reuse_session(client_instance, session, resume_point.token) if resume_point else None
+    if token is None:
+        token = login_robot(client_instance, session)
+    if token is None:
         return None
-    send_log(f"Successfully registered operator.")
+
+    if resume_point is not None and is_at_default_position(client_instance, token, poses):
+        session.send_log("Robot is already at its default position, skipping initialization.")
+    else:
+        initialize(client_instance, token, poses)
     return token
 
 
-def game_thread():
-    global game_state, client, token
-    
-    set_log_callback(send_log)
-    set_collision_callback(handle_collision)
-    
-    send_log("Initializing robot...")
-    client = XArmAPIClient()
-    token = login_robot(client)
-    
+def reset_robot_figure(client, token, session, station, preparer, from_field, player_field):
+    """Send the robot's figure home after the player's collision, journaled so a crash mid-carry is noticed."""
+    session.journal.record("figure_reset_started", from_field=from_field, player_field=player_field)
+    preparer.cancel()
+    reset_figure(client, token, "robot", from_field, player_field, session.send_log,
+                 session.wait_for_collision_confirmation, station.board, station.board_watcher, poses=station.poses)
+    if session.game_state.get_robot_position() != 1:
+        session.game_state.reset_robot_position()
+    session.journal.record("figure_reset_done")
+    session.send_log("Robot's character has been reset to field 1.", "system")
+
+
+def finish_figure_reset(client, token, session, station, figure_reset):
+    """Let a human finish a reset of the robot's figure that a crash interrupted."""
+    # The figure may still be in the gripper
+    release_object(client, token)
+    move_to_default_position(client, token, station.poses)
+    confirm_move(station.board_watcher, {"robot": 1, "player": figure_reset["player_field"]},
+                 "The robot stopped while resetting its character. Please put the robot's character on field 1.",
+                 session.send_log, session.wait_for_collision_confirmation)
+    if session.game_state.get_robot_position() != 1:
+        session.game_state.reset_robot_position()
+    session.journal.record("figure_reset_done")
+
+
+def run_game(session, station, resume_point=None):
+    """Play one game of a session on a station; called by the station pool's worker thread."""
+    send_log = session.send_log
+    broadcast = session.broadcast
+
+    ports = TurnPorts(log=send_log, confirm=session.handle_collision, dice_fallback=session.dice_fallback)
+
+    send_log(f"Initializing robot at {station.name}...")
+    client = XArmAPIClient(station.base_url)
+    report = boot({
+        "robot": lambda: connect_robot(client, session, station.poses, resume_point),
+        "camera": lambda: warm_camera(station.camera_url, station.dice_picker),
+        "tables": lambda: warm_tables(station.board),
+    }, send_log)
+    token = report.results.get("robot")
+
     if token is None:
         send_log("Failed to get token. Aborting game.")
         return
-    
-    initialize(client, token)
-    game_state = GameState()
-    
-    send_log("Game initialized! Starting game...")
-    send_state_update()
-    
-    while not game_state.is_game_over():
-        if game_state.get_current_turn() == "player":
-            send_log("Your turn! Roll your dice and enter the value.", "player")
-            broadcast({'type': 'turn_request'})
-            
-            waiting_for_input.clear()
-            waiting_for_input.wait()
-            
-            global user_dice_value
-            with game_lock:
-                dice_value = user_dice_value
-                user_dice_value = None
-            
-            if dice_value is None:
-                continue
-            
-            old_position = game_state.get_player_position()
-            old_robot_position = game_state.get_robot_position()
-            target_field = old_position + dice_value
-            
-            if target_field == old_robot_position and target_field < game_state.max_field:
-                send_log(f"Collision detected! You would land on field {target_field} where the robot is.", "player")
-                broadcast({
-                    'type': 'collision_prompt',
-                    'message': f"Collision! Please move the robot's character back to field 1 on the physical board."
-                })
-                
-                collision_confirmed.clear()
-                collision_confirmed.wait()
-                
-                game_state.robot_position = 1
-                send_log("Robot's character has been reset to field 1.", "system")
-                send_state_update()
-            
-            new_position = game_state.move_player(dice_value)
-            
-            if new_position is None:
-                send_log("Unexpected collision state. Skipping turn.", "system")
-                continue
-            
-            send_log(f"You rolled {dice_value}. Moving from field {old_position} to field {new_position}!", "player")
-            
-            if game_state.check_special_field(new_position):
-                final_position = game_state.get_special_field_target(new_position)
-                if final_position > new_position:
-                    send_log(f"Ladder! You climb from field {new_position} to field {final_position}!", "player")
-                else:
-                    send_log(f"Snake! You slide down from field {new_position} to field {final_position}!", "player")
-            
-            send_log("Please move your character on the physical board.", "player")
-            send_state_update()
-            
-            if game_state.is_game_over():
-                break
-            
-            broadcast({'type': 'waiting', 'message': 'Waiting for robot turn...'})
-            time.sleep(2)
-            game_state.switch_turn()
-            
-        else:
-            send_log("Robot's turn starting...", "robot")
-            broadcast({'type': 'robot_turn'})
-            
-            if not robot_turn(client, token, game_state):
-                send_log("Robot turn failed. Ending game.", "system")
-                break
-            
-            send_state_update()
-            
-            if not game_state.is_game_over():
-                game_state.switch_turn()
-    
+
+    preparer = IdlePreparer(client, token, station.poses)
+
+    if resume_point is None:
+        game_state = GameState(station.board)
+        journal = GameJournal(station.journal_path)
+        journal.record("game_started", durable=True, session=session.id, token=token)
+        send_log("Game initialized! Starting game...")
+    else:
+        game_state = GameState.from_snapshot(resume_point.snapshot, station.board)
+        journal = GameJournal(station.journal_path, fresh=False)
+        journal.record("game_resumed", durable=True, token=token)
+        send_log("Resuming the interrupted game...")
+    journal.attach(game_state)
+    session.game_state = game_state
+    session.journal = journal
+    robot_resume = resume_point.robot_turn if resume_point else None
+
+    # A move was completed before the crash, only the turn switch is missing
+    if resume_point is not None and resume_point.turn_finished:
+        game_state.switch_turn()
+
+    session.send_state_update()
+
+    try:
+        if resume_point is not None and resume_point.figure_reset is not None:
+            finish_figure_reset(client, token, session, station, resume_point.figure_reset)
+
+        while not game_state.is_game_over():
+            if game_state.get_current_turn() == "player":
+                send_log("Your turn! Roll your dice and enter the value.", "player")
+                broadcast({'type': 'turn_request'})
+                preparer.start()
+
+                dice_value = session.wait_for_dice()
+
+                if dice_value is None:
+                    continue
+
+                old_position = game_state.get_player_position()
+                old_robot_position = game_state.get_robot_position()
+                target_field = old_position + dice_value
+
+                if target_field == old_robot_position and target_field < game_state.max_field:
+                    send_log(f"Collision detected! You would land on field {target_field} where the robot is.", "player")
+                    reset_robot_figure(client, token, session, station, preparer, old_robot_position, old_position)
+                    session.send_state_update()
+
+                robot_before_move = game_state.get_robot_position()
+                new_position = game_state.move_player(dice_value)
+
+                if new_position is None:
+                    send_log("Unexpected collision state. Skipping turn.", "system")
+                    continue
+                journal.record("player_moved", dice_value=dice_value)
+
+                # A ladder or snake ending on the robot's field sends the robot home as well;
+                # the player's figure still stands on its old field while the arm works
+                if game_state.get_robot_position() != robot_before_move:
+                    send_log(f"Collision! Your move ends on field {new_position} where the robot is.", "player")
+                    reset_robot_figure(client, token, session, station, preparer, robot_before_move, old_position)
+                # The robot moves next; switching before the update sends the odds for the side to move
+                if not game_state.is_game_over():
+                    game_state.switch_turn()
+
+                send_log(f"You rolled {dice_value}. Moving from field {old_position} to field {new_position}!", "player")
+
+                if game_state.check_special_field(new_position):
+                    final_position = game_state.get_special_field_target(new_position)
+                    if final_position > new_position:
+                        send_log(f"Ladder! You climb from field {new_position} to field {final_position}!", "player")
+                    else:
+                        send_log(f"Snake! You slide down from field {new_position} to field {final_position}!", "player")
+
+                send_log("Please move your character on the physical board.", "player")
+                session.send_state_update()
+
+                if game_state.is_game_over():
+                    break
+
+                # Plan every possible robot move now so the robot's turn starts with no planning left
+                estimates = get_plan_cache(station.board).prebuild(game_state.get_robot_position(),
+                                                                   game_state.get_player_position(), game_state.max_field)
+                eta = eta_range(estimates)
+                if eta is not None:
+                    broadcast({'type': 'robot_eta', 'min_seconds': round(eta[0]), 'max_seconds': round(eta[1])})
+
+                broadcast({'type': 'waiting', 'message': 'Waiting for robot turn...'})
+                clock.sleep(2)
+
+            else:
+                send_log("Robot's turn starting...", "robot")
+                broadcast({'type': 'robot_turn'})
+                # The player has had the planning time to move their figure; a mismatch is only reported
+                if robot_resume is None:
+                    verify_positions(station.board_watcher, game_state, send_log)
+
+                completed = robot_turn(client, token, game_state, ports, preparer, journal, robot_resume,
+                                       station.camera_url, station.dice_picker, station.board_watcher, station.poses)
+                robot_resume = None
+                if not completed:
+                    send_log("Robot turn failed. Ending game.", "system")
+                    break
+
+                if not game_state.is_game_over():
+                    game_state.switch_turn()
+                session.send_state_update()
+    except GameAbandoned as e:
+        send_log(str(e), "system")
+
+    preparer.cancel(return_home=False)
+    journal.record("game_ended", durable=True, winner=game_state.get_winner())
+    journal.close()
     send_log("Game Over!", "system")
-    
+    if game_state.is_game_over():
+        record_game_completed()
+
     if game_state.get_winner() == "player":
         winner_message = "Congratulations! You won!"
     elif game_state.get_winner() == "robot":
         winner_message = "The robot won! Better luck next time!"
     else:
         winner_message = "Game ended"
-    
+
+    final_state = game_state.snapshot()
     broadcast({
         'type': 'game_over',
         'winner_message': winner_message,
-        'player_position': game_state.get_player_position(),
-        'robot_position': game_state.get_robot_position()
+        'player_position': final_state.player_position,
+        'robot_position': final_state.robot_position
     })
-    
+
+    for line in profiling.format_summary().split("\n"):
+        send_log(line, "system")
+
     send_log("Returning robot to default position...", "system")
-    move_to_default_position(client, token)
+    move_to_default_position(client, token, station.poses)
     send_log("Thank you for playing!", "system")
 
 
+pool = StationPool.from_config(run_game)
+WS_CLIENTS.set_function(pool.client_count)
+WS_QUEUE_DEPTH.set_function(lambda: max(pool.queue_depths(), default=0))
+SESSIONS_QUEUED.set_function(pool.queued_count)
+STATIONS_BUSY.set_function(pool.busy_count)
+
+
+def resume_interrupted_game():
+    """Start the station workers, which first continue any game the previous server process did not finish.
+
+    Returns True if there was one.
+    """
+    return bool(pool.start())
+
+
+def find_session(data):
+    session_id = (data or {}).get('session_id')
+    session = pool.get(session_id) if session_id else None
+    if session is None:
+        raise LookupError('Unknown game session')
+    return session
+
+
 @app.route('/')
 def index():
     return render_template('index.html')
 
 
+@app.route('/metrics')
+def metrics():
+    return Response(REGISTRY.render(), mimetype='text/plain; version=0.0.4')
+
+
+@app.route('/profile/summary')
+def profile_summary():
+    session = pool.get(request.args.get('session'))
+    if session is None:
+        return jsonify({'error': 'Unknown game session'}), 404
+    return jsonify(profiling.session_summary(session.id))
+
+
+@app.route('/profile/last_turn')
+def profile_last_turn():
+    session = pool.get(request.args.get('session'))
+    if session is None:
+        return jsonify({'error': 'Unknown game session'}), 404
+    trace = profiling.last_trace(session.id)
+    if trace is None:
+        return jsonify({'error': 'No robot turn profiled yet'}), 404
+    return jsonify(trace)
+
+
+@app.route('/sessions')
+def list_sessions():
+    return jsonify([dict(session.describe(), queue_position=pool.queue_position(session))
+                    for session in pool.sessions()])
+
+
 @app.route('/start_game', methods=['POST'])
 def start_game():
     try:
-        thread = threading.Thread(target=game_thread, daemon=True)
-        thread.start()
-        return jsonify({'success': True})
+        session = pool.submit()
+        return jsonify({'success': True, 'session_id': session.id,
+                        'queue_position': pool.queue_position(session)})
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)})
 
 
 @app.route('/submit_dice', methods=['POST'])
 def submit_dice():
-    global user_dice_value
-    
     try:
         data = request.json
+        session = find_session(data)
         dice_value = int(data['dice_value'])
-        
+
         if not 1 <= dice_value <= 6:
             return jsonify({'success': False, 'error': 'Invalid dice value'})
-        
-        with game_lock:
-            user_dice_value = dice_value
-        
-        waiting_for_input.set()
+
+        session.submit_dice(dice_value)
+        return jsonify({'success': True})
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)})
+
+
+@app.route('/cancel_game', methods=['POST'])
+def cancel_game():
+    try:
+        pool.cancel(find_session(request.json))
         return jsonify({'success': True})
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)})
@@ -230,23 +349,30 @@ def submit_dice():
 
 @app.route('/collision_confirmed', methods=['POST'])
 def confirm_collision():
-    collision_confirmed.set()
-    return jsonify({'success': True})
+    try:
+        find_session(request.json).confirm_collision()
+        return jsonify({'success': True})
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)})
 
 
 @sock.route('/ws')
 def websocket(ws):
-    ws_clients.append(ws)
+    session = pool.get(request.args.get('session'))
+    if session is None:
+        ws.send('{"type": "session_unknown"}')
+        return
+    since = request.args.get('since', type=int)
+    channel = session.hub.register(ws, since=since, epoch=request.args.get('epoch'))
     try:
-        while True:
-            data = ws.receive()
-            if data is None:
+        while not channel.closed:
+            data = ws.receive(timeout=1)
+            if data is None and not ws.connected:
                 break
     finally:
-        if ws in ws_clients:
-            ws_clients.remove(ws)
+        session.hub.unregister(channel)
 
 
 if __name__ == '__main__':
+    resume_interrupted_game()
     app.run(host='0.0.0.0', port=5001, debug=False)
-
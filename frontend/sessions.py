@@ -0,0 +1,302 @@
+import os
+import threading
+import time
+import uuid
+from collections import deque
+
+import profiling
+from config import CALIBRATION_FILE, JOURNAL_FILE, MAX_FINISHED_SESSIONS, PLAYER_IDLE_TIMEOUT, STATIONS
+from frontend.ws_hub import WebSocketHub
+from game.board import Board
+from game.journal import load_resume_point
+from game.markov import get_odds_table
+from robot.calibration import load_calibration
+from vision.board_state import load_board_watcher
+from vision.pickup import load_dice_picker
+
+
+class Station:
+    """One robot arm with its dice camera and board calibration."""
+
+    def __init__(self, name, base_url, camera_url, calibration=CALIBRATION_FILE, board_camera_url=None):
+        self.name = name
+        self.base_url = base_url
+        self.camera_url = camera_url
+        self.calibration = load_calibration(calibration)
+        self.poses = self.calibration.poses
+        self.board = Board.from_calibration(self.calibration)
+        self.dice_picker = load_dice_picker(self.calibration)
+        self.board_watcher = load_board_watcher(board_camera_url, self.calibration, self.board)
+
+    @classmethod
+    def from_config(cls, config):
+        return cls(**config)
+
+    @property
+    def journal_path(self):
+        root, ext = os.path.splitext(JOURNAL_FILE)
+        return f"{root}-{self.name}{ext}"
+
+
+class GameAbandoned(Exception):
+    """Raised in a game's thread when its player cancelled it or stopped answering."""
+
+
+class GameSession:
+    """One web game: its state, the inputs the browser sends and its own event channel."""
+
+    def __init__(self, session_id=None):
+        self.id = session_id or uuid.uuid4().hex[:8]
+        self.status = "queued"
+        self.station = None
+        self.finished_at = None
+        self.game_state = None
+        self.journal = None
+        self.last_sent_version = None
+        self.user_dice_value = None
+        self.input_lock = threading.Lock()
+        self.waiting_for_input = threading.Event()
+        self.collision_confirmed = threading.Event()
+        self.cancelled = threading.Event()
+        self.hub = WebSocketHub(snapshot_provider=self.build_snapshot_message)
+
+    def broadcast(self, message):
+        self.hub.publish(message)
+
+    def send_log(self, message, category='system'):
+        self.broadcast({'type': 'log', 'message': message, 'category': category})
+
+    def odds(self, snapshot):
+        board = self.game_state.board
+        return get_odds_table(board.board_map, board.fields).for_snapshot(snapshot)
+
+    def build_snapshot_message(self):
+        message = {'type': 'snapshot', 'session_id': self.id, 'status': self.status,
+                   'station': self.station.name if self.station else None}
+        if self.game_state is None:
+            message['game_active'] = False
+            return message
+        snapshot = self.game_state.snapshot()
+        odds = self.odds(snapshot)
+        message.update({
+            'game_active': not snapshot.game_over and self.status == "running",
+            'version': snapshot.version,
+            'player_position': snapshot.player_position,
+            'robot_position': snapshot.robot_position,
+            'current_turn': snapshot.current_turn,
+            'game_over': snapshot.game_over,
+            'player_win_probability': odds['player_win_probability'],
+            'expected_remaining_moves': odds['expected_remaining_moves']
+        })
+        return message
+
+    def send_state_update(self):
+        if self.game_state is None:
+            return
+        snapshot = self.game_state.snapshot()
+        if snapshot.version == self.last_sent_version:
+            return
+        self.last_sent_version = snapshot.version
+        odds = self.odds(snapshot)
+        self.broadcast({
+            'type': 'state_update',
+            'version': snapshot.version,
+            'player_position': snapshot.player_position,
+            'robot_position': snapshot.robot_position,
+            'player_win_probability': odds['player_win_probability'],
+            'expected_remaining_moves': odds['expected_remaining_moves']
+        })
+
+    def handle_collision(self, message):
+        self.send_log(message, 'system')
+        self.wait_for_collision_confirmation(message)
+
+    def wait_for_collision_confirmation(self, message):
+        self.collision_confirmed.clear()
+        self.broadcast({'type': 'collision_prompt', 'message': message})
+        self._wait_for_player(self.collision_confirmed, "confirmation")
+
+    def wait_for_dice(self):
+        self.waiting_for_input.clear()
+        self._wait_for_player(self.waiting_for_input, "dice value")
+        with self.input_lock:
+            dice_value, self.user_dice_value = self.user_dice_value, None
+        return dice_value
+
+    def dice_fallback(self, log):
+        """Ask the browser for the robot's dice value when the camera cannot read it."""
+        log("Automatic detection failed. Please enter the robot's dice value.", 'robot')
+        self.broadcast({'type': 'dice_prompt', 'message': "What did the robot roll?"})
+        return self.wait_for_dice()
+
+    def submit_dice(self, dice_value):
+        with self.input_lock:
+            self.user_dice_value = dice_value
+        self.waiting_for_input.set()
+
+    def confirm_collision(self):
+        self.collision_confirmed.set()
+
+    def cancel(self):
+        """End the game at the next input it waits for."""
+        self.cancelled.set()
+        self.waiting_for_input.set()
+        self.collision_confirmed.set()
+
+    def _wait_for_player(self, event, what, timeout=PLAYER_IDLE_TIMEOUT):
+        """Wait for the player's input; raises GameAbandoned if the game is cancelled or nobody answers."""
+        if not self.cancelled.is_set() and not event.wait(timeout):
+            raise GameAbandoned(f"No {what} for {timeout / 60:.0f} minutes, ending the game.")
+        if self.cancelled.is_set():
+            raise GameAbandoned("The game was cancelled.")
+
+    def describe(self):
+        return {'session_id': self.id, 'status': self.status,
+                'station': self.station.name if self.station else None,
+                'clients': self.hub.client_count()}
+
+
+class StationPool:
+    """Assigns queued game sessions to a pool of robot stations.
+
+    Every station has a worker thread that takes the oldest queued session and runs
+    it with runner(session, station, resume_point), so N stations play N games at
+    the same time. Before taking new work a worker resumes the game its station's
+    journal shows as unfinished.
+    """
+
+    def __init__(self, stations, runner, max_finished=MAX_FINISHED_SESSIONS):
+        self.stations = list(stations)
+        self.runner = runner
+        self.max_finished = max_finished
+        self._sessions = {}
+        self._queue = deque()
+        self._busy = set()
+        self._condition = threading.Condition()
+        self._started = False
+
+    @classmethod
+    def from_config(cls, runner):
+        return cls([Station.from_config(config) for config in STATIONS], runner)
+
+    def start(self):
+        """Start one worker per station. Returns the sessions resumed from the journals."""
+        with self._condition:
+            if self._started:
+                return []
+            self._started = True
+
+        resumed = []
+        for station in self.stations:
+            resume_point = load_resume_point(station.journal_path)
+            session = None
+            if resume_point is not None:
+                session = GameSession(resume_point.session_id)
+                with self._condition:
+                    self._sessions[session.id] = session
+                resumed.append(session)
+            thread = threading.Thread(target=self._work, args=(station, session, resume_point), daemon=True)
+            thread.start()
+        return resumed
+
+    def submit(self):
+        """Queue a new game and return its session."""
+        self.start()
+        session = GameSession()
+        with self._condition:
+            self._sessions[session.id] = session
+            self._queue.append(session)
+            self._condition.notify()
+        self._announce_queue()
+        return session
+
+    def cancel(self, session):
+        """Drop a queued session, or end a running game at the next input it waits for."""
+        with self._condition:
+            queued = session in self._queue
+            if queued:
+                self._queue.remove(session)
+                session.status = "finished"
+                session.finished_at = time.time()
+        if queued:
+            session.broadcast({'type': 'game_over', 'winner_message': 'Game cancelled',
+                               'player_position': 1, 'robot_position': 1})
+            self._announce_queue()
+            self._prune()
+        else:
+            session.cancel()
+
+    def get(self, session_id):
+        with self._condition:
+            return self._sessions.get(session_id)
+
+    def sessions(self):
+        with self._condition:
+            return list(self._sessions.values())
+
+    def queue_position(self, session):
+        with self._condition:
+            try:
+                return self._queue.index(session) + 1
+            except ValueError:
+                return 0
+
+    def queued_count(self):
+        with self._condition:
+            return len(self._queue)
+
+    def busy_count(self):
+        with self._condition:
+            return len(self._busy)
+
+    def client_count(self):
+        return sum(session.hub.client_count() for session in self.sessions())
+
+    def queue_depths(self):
+        return [depth for session in self.sessions() for depth in session.hub.queue_depths()]
+
+    def _announce_queue(self):
+        with self._condition:
+            queued = list(self._queue)
+        for position, session in enumerate(queued, start=1):
+            session.broadcast({'type': 'queued', 'position': position})
+
+    def _work(self, station, session, resume_point):
+        if session is not None:
+            self._run(station, session, resume_point)
+        while True:
+            with self._condition:
+                while not self._queue:
+                    self._condition.wait()
+                session = self._queue.popleft()
+            self._announce_queue()
+            self._run(station, session, None)
+
+    def _run(self, station, session, resume_point):
+        with self._condition:
+            self._busy.add(station.name)
+        session.station = station
+        session.status = "running"
+        session.broadcast({'type': 'station_assigned', 'station': station.name})
+        try:
+            with profiling.scope(session.id):
+                self.runner(session, station, resume_point)
+        except Exception as e:
+            session.send_log(f"Game stopped by an error: {e}", "system")
+        finally:
+            session.status = "finished"
+            session.finished_at = time.time()
+            with self._condition:
+                self._busy.discard(station.name)
+            self._prune()
+
+    def _prune(self):
+        with self._condition:
+            finished = sorted((s for s in self._sessions.values() if s.status == "finished"),
+                              key=lambda s: s.finished_at)
+            expired = finished[:max(0, len(finished) - self.max_finished)]
+            for session in expired:
+                del self._sessions[session.id]
+        for session in expired:
+            session.hub.close()
+            profiling.forget(session.id)
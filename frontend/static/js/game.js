@@ -1,4 +1,9 @@
 let socket;
+let sessionId = sessionStorage.getItem('sessionId');
+let lastSeq = null;
+let serverEpoch = null;
+let lastVersion = null;
+let reconnectDelay = 1000;
 
 function startGame() {
     document.getElementById('start-button').disabled = true;
@@ -13,7 +18,7 @@ function startGame() {
             addLog('Game started!', 'system');
             document.getElementById('action-area').style.display = 'block';
             document.getElementById('start-button').style.display = 'none';
-            connectWebSocket();
+            joinSession(data.session_id);
         } else {
             addLog('Failed to start game: ' + data.error, 'system');
             document.getElementById('start-button').disabled = false;
@@ -25,17 +30,59 @@ function startGame() {
     });
 }
 
+function joinSession(id) {
+    sessionId = id;
+    sessionStorage.setItem('sessionId', id);
+    lastSeq = null;
+    serverEpoch = null;
+    lastVersion = null;
+    if (socket) {
+        socket.onclose = null;
+        socket.close();
+    }
+    connectWebSocket();
+}
+
+function leaveSession() {
+    sessionId = null;
+    sessionStorage.removeItem('sessionId');
+    if (socket) {
+        socket.onclose = null;
+        socket.close();
+    }
+    document.getElementById('start-button').style.display = '';
+    document.getElementById('start-button').disabled = false;
+}
+
 function connectWebSocket() {
+    if (!sessionId) {
+        return;
+    }
     const protocol = window.location.protocol === 'https:' ? 'wss:' : 'ws:';
-    socket = new WebSocket(`${protocol}//${window.location.host}/ws`);
+    let url = `${protocol}//${window.location.host}/ws?session=${encodeURIComponent(sessionId)}`;
+    if (lastSeq !== null) {
+        // Ask only for the events missed since the last one we saw
+        url += `&since=${lastSeq}&epoch=${serverEpoch}`;
+    }
+    socket = new WebSocket(url);
+    
+    socket.onopen = function() {
+        reconnectDelay = 1000;
+    };
     
     socket.onmessage = function(event) {
         const data = JSON.parse(event.data);
+        if (data.seq !== undefined) {
+            lastSeq = data.seq;
+            serverEpoch = data.epoch;
+        }
         handleMessage(data);
     };
     
     socket.onclose = function() {
-        addLog('Connection closed', 'system');
+        addLog('Connection closed, reconnecting...', 'system');
+        setTimeout(connectWebSocket, reconnectDelay);
+        reconnectDelay = Math.min(reconnectDelay * 2, 10000);
     };
     
     socket.onerror = function(error) {
@@ -44,8 +91,12 @@ function connectWebSocket() {
 }
 
 function handleMessage(data) {
-    if (data.type === 'state_update') {
+    if (data.type === 'snapshot') {
+        handleSnapshot(data);
+    } else if (data.type === 'state_update') {
         updateGameState(data);
+    } else if (data.type === 'log_batch') {
+        data.messages.forEach(entry => addLog(entry.message, entry.category || 'system'));
     } else if (data.type === 'log') {
         addLog(data.message, data.category || 'system');
     } else if (data.type === 'turn_request') {
@@ -56,14 +107,65 @@ function handleMessage(data) {
         showGameOver(data);
     } else if (data.type === 'waiting') {
         showWaiting(data.message);
+    } else if (data.type === 'dice_prompt') {
+        showDicePrompt(data.message);
     } else if (data.type === 'collision_prompt') {
         handleCollisionPrompt(data);
+    } else if (data.type === 'queued') {
+        showWaiting(`Waiting for a free robot station (position ${data.position} in the queue)...`);
+    } else if (data.type === 'station_assigned') {
+        addLog(`Your game is playing at ${data.station}.`, 'system');
+    } else if (data.type === 'session_unknown') {
+        addLog('That game is no longer available.', 'system');
+        leaveSession();
+    } else if (data.type === 'robot_eta') {
+        document.getElementById('robot-eta').textContent = data.min_seconds === data.max_seconds
+            ? data.min_seconds + 's'
+            : data.min_seconds + '-' + data.max_seconds + 's';
     }
 }
 
 function updateGameState(data) {
+    // A reconnect can deliver an update older than the snapshot it follows
+    if (data.version !== undefined) {
+        if (lastVersion !== null && data.version < lastVersion) {
+            return;
+        }
+        lastVersion = data.version;
+    }
     document.getElementById('player-position').textContent = data.player_position;
     document.getElementById('robot-position').textContent = data.robot_position;
+    if (data.player_win_probability !== undefined) {
+        document.getElementById('win-chance').textContent = Math.round(data.player_win_probability * 100) + '%';
+        document.getElementById('moves-left').textContent = Math.round(data.expected_remaining_moves);
+    }
+}
+
+function handleSnapshot(data) {
+    if (data.status === 'queued') {
+        document.getElementById('status-message').style.display = 'none';
+        document.getElementById('start-button').style.display = 'none';
+        document.getElementById('action-area').style.display = 'block';
+        return;
+    }
+    if (!data.game_active) {
+        return;
+    }
+    
+    updateGameState(data);
+    
+    // A freshly loaded page joins the running game instead of offering to start a new one
+    const actionArea = document.getElementById('action-area');
+    if (actionArea.style.display === 'none') {
+        document.getElementById('status-message').style.display = 'none';
+        document.getElementById('start-button').style.display = 'none';
+        actionArea.style.display = 'block';
+        if (data.current_turn === 'player') {
+            showPlayerTurn();
+        } else {
+            showRobotTurn();
+        }
+    }
 }
 
 function showPlayerTurn() {
@@ -74,6 +176,11 @@ function showPlayerTurn() {
     document.getElementById('dice-value').focus();
 }
 
+function showDicePrompt(message) {
+    showPlayerTurn();
+    document.getElementById('current-turn').textContent = message;
+}
+
 function showRobotTurn() {
     document.getElementById('current-turn').textContent = "Robot's Turn";
     document.getElementById('dice-input').style.display = 'none';
@@ -99,7 +206,7 @@ function submitDiceRoll() {
         headers: {
             'Content-Type': 'application/json'
         },
-        body: JSON.stringify({ dice_value: diceValue })
+        body: JSON.stringify({ session_id: sessionId, dice_value: diceValue })
     })
     .then(response => response.json())
     .then(data => {
@@ -128,7 +235,11 @@ function handleCollisionPrompt(data) {
 
 function confirmCollision(modal) {
     fetch('/collision_confirmed', {
-        method: 'POST'
+        method: 'POST',
+        headers: {
+            'Content-Type': 'application/json'
+        },
+        body: JSON.stringify({ session_id: sessionId })
     })
     .then(response => response.json())
     .then(data => {
@@ -139,6 +250,27 @@ function confirmCollision(modal) {
     });
 }
 
+function cancelGame() {
+    if (!confirm('End this game and free the robot station?')) {
+        return;
+    }
+    fetch('/cancel_game', {
+        method: 'POST',
+        headers: {
+            'Content-Type': 'application/json'
+        },
+        body: JSON.stringify({ session_id: sessionId })
+    })
+    .then(response => response.json())
+    .then(data => {
+        if (data.success) {
+            addLog('Ending the game...', 'system');
+        } else {
+            alert('Error: ' + data.error);
+        }
+    });
+}
+
 function showGameOver(data) {
     document.getElementById('game-over').style.display = 'flex';
     document.getElementById('winner-message').textContent = data.winner_message;
@@ -157,6 +289,8 @@ function addLog(message, category) {
 }
 
 document.addEventListener('DOMContentLoaded', function() {
+    connectWebSocket();
+    
     const diceInput = document.getElementById('dice-value');
     if (diceInput) {
         diceInput.addEventListener('keypress', function(e) {
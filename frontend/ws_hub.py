@@ -0,0 +1,196 @@
+import json
+import queue
+import threading
+import time
+import uuid
+from collections import deque
+
+# Message types where only the latest pending one matters to a client
+COALESCED_TYPES = {'state_update'}
+
+
+class ClientChannel:
+    """One websocket client with a bounded send queue drained by its own writer thread."""
+
+    def __init__(self, ws, max_queue):
+        self.ws = ws
+        self.max_queue = max_queue
+        self.closed = False
+        # Game state version of the snapshot the client got; older state updates are not sent
+        self.state_version = None
+        self._queue = deque()
+        self._condition = threading.Condition()
+        self._thread = threading.Thread(target=self._write_loop, daemon=True)
+        self._thread.start()
+
+    def offer(self, message_type, payload):
+        """Queue an encoded message. Returns False if the client is closed or too far behind."""
+        with self._condition:
+            if self.closed:
+                return False
+            if message_type in COALESCED_TYPES:
+                self._queue = deque(item for item in self._queue if item[0] != message_type)
+            if len(self._queue) >= self.max_queue:
+                self.closed = True
+                self._condition.notify()
+                return False
+            self._queue.append((message_type, payload))
+            self._condition.notify()
+            return True
+
+    def depth(self):
+        with self._condition:
+            return len(self._queue)
+
+    def close(self):
+        with self._condition:
+            self.closed = True
+            self._queue.clear()
+            self._condition.notify()
+
+    def _write_loop(self):
+        while True:
+            with self._condition:
+                while not self._queue and not self.closed:
+                    self._condition.wait()
+                if self.closed:
+                    break
+                _, payload = self._queue.popleft()
+            try:
+                self.ws.send(payload)
+            except Exception:
+                break
+
+        self.close()
+        try:
+            self.ws.close()
+        except Exception:
+            pass
+
+
+class WebSocketHub:
+    """Fans messages out to all websocket clients without blocking the publisher.
+
+    publish() only puts the message on an inbox queue. A dispatcher thread collects
+    messages for a short window, folds consecutive logs into one log_batch frame and
+    consecutive state updates into the latest one, then gives each frame the next
+    sequence number, keeps it in a ring buffer for reconnecting clients, encodes it
+    once and hands it to every client's bounded queue. Clients that fall too far
+    behind are disconnected instead of slowing everyone else down.
+    """
+
+    def __init__(self, max_queue=256, history=200, snapshot_provider=None, batch_window=0.05):
+        self.max_queue = max_queue
+        self.batch_window = batch_window
+        self.snapshot_provider = snapshot_provider
+        # Changes on every server start so clients can tell their sequence numbers are stale
+        self.epoch = uuid.uuid4().hex[:8]
+        self.seq = 0
+        self._history = deque(maxlen=history)
+        self._clients = set()
+        self._lock = threading.Lock()
+        self._inbox = queue.SimpleQueue()
+        self._dispatcher = threading.Thread(target=self._dispatch_loop, daemon=True)
+        self._dispatcher.start()
+
+    def register(self, ws, since=None, epoch=None):
+        """Add a client. It gets the events after `since` still in the buffer, then a current snapshot."""
+        channel = ClientChannel(ws, self.max_queue)
+        with self._lock:
+            if since is not None and epoch == self.epoch and since <= self.seq:
+                oldest = self._history[0][0] if self._history else self.seq + 1
+                if since + 1 < oldest:
+                    gap = {'type': 'log', 'message': 'Some earlier messages were missed while disconnected.',
+                           'category': 'system', 'seq': self.seq, 'epoch': self.epoch}
+                    channel.offer('log', json.dumps(gap))
+                for seq, message_type, payload in self._history:
+                    if seq > since:
+                        channel.offer(message_type, payload)
+
+            snapshot = self.snapshot_provider() if self.snapshot_provider else None
+            if snapshot is not None:
+                snapshot = dict(snapshot, seq=self.seq, epoch=self.epoch)
+                channel.state_version = snapshot.get('version')
+                channel.offer(snapshot['type'], json.dumps(snapshot))
+
+            self._clients.add(channel)
+        return channel
+
+    def unregister(self, channel):
+        with self._lock:
+            self._clients.discard(channel)
+        channel.close()
+
+    def publish(self, message):
+        self._inbox.put(message)
+
+    def close(self):
+        """Deliver what is already published, then stop the dispatcher and disconnect all clients."""
+        self._inbox.put(None)
+
+    def client_count(self):
+        with self._lock:
+            return len(self._clients)
+
+    def queue_depths(self):
+        with self._lock:
+            clients = list(self._clients)
+        return [channel.depth() for channel in clients]
+
+    def _collect(self):
+        messages = [self._inbox.get()]
+        deadline = time.monotonic() + self.batch_window
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                messages.append(self._inbox.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return messages
+
+    def _compact(self, messages):
+        frames = []
+        for message in messages:
+            message_type = message.get('type')
+            previous = frames[-1] if frames else None
+            if message_type == 'log':
+                entry = {'message': message['message'], 'category': message.get('category', 'system')}
+                if previous is not None and previous['type'] == 'log_batch':
+                    previous['messages'].append(entry)
+                else:
+                    frames.append({'type': 'log_batch', 'messages': [entry]})
+            elif message_type in COALESCED_TYPES and previous is not None and previous['type'] == message_type:
+                frames[-1] = message
+            else:
+                frames.append(message)
+        return frames
+
+    def _dispatch_loop(self):
+        while True:
+            messages = self._collect()
+            closing = None in messages
+            for frame in self._compact([message for message in messages if message is not None]):
+                message_type = frame.get('type')
+
+                with self._lock:
+                    self.seq += 1
+                    payload = json.dumps(dict(frame, seq=self.seq, epoch=self.epoch))
+                    self._history.append((self.seq, message_type, payload))
+                    clients = list(self._clients)
+
+                for channel in clients:
+                    # Still in the inbox when the client's snapshot was built from the live state
+                    if (message_type == 'state_update' and channel.state_version is not None
+                            and frame.get('version', channel.state_version) < channel.state_version):
+                        continue
+                    if not channel.offer(message_type, payload):
+                        self.unregister(channel)
+
+            if closing:
+                with self._lock:
+                    clients, self._clients = list(self._clients), set()
+                for channel in clients:
+                    channel.close()
+                return
@@ -0,0 +1,133 @@
+import argparse
+import contextlib
+import io
+import json
+import os
+import subprocess
+import time
+
+import numpy as np
+
+from game.replay import replay_games
+from vision.simulated import RecordedCamera
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              check=True, cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def measure_turn(trace, compute_seconds):
+    """Reduce a robot turn's Chrome trace to its duration, phase times and API calls."""
+    events = [event for event in trace["traceEvents"] if event["ph"] == "X"]
+    phases = {}
+    for event in events:
+        if event["cat"] == "phase":
+            phases[event["name"]] = phases.get(event["name"], 0.0) + event["dur"] / 1e6
+    return {
+        "seconds": max((event["ts"] + event["dur"] for event in events), default=0) / 1e6,
+        "phases": phases,
+        "api_calls": sum(event["cat"] == "network" for event in events),
+        "compute_seconds": compute_seconds,
+    }
+
+
+def distribution(values):
+    values = np.asarray(values, dtype=float)
+    if values.size == 0:
+        return {"count": 0}
+    return {
+        "count": int(values.size),
+        "mean": round(float(values.mean()), 4),
+        "p50": round(float(np.percentile(values, 50)), 4),
+        "p95": round(float(np.percentile(values, 95)), 4),
+        "max": round(float(values.max()), 4),
+    }
+
+
+def summarize_turns(turns):
+    phase_names = sorted({name for turn in turns for name in turn["phases"]})
+    return {
+        "turns": len(turns),
+        "turn_seconds": distribution([turn["seconds"] for turn in turns]),
+        "phase_seconds": {name: distribution([turn["phases"][name] for turn in turns if name in turn["phases"]])
+                          for name in phase_names},
+        "api_calls_per_turn": distribution([turn["api_calls"] for turn in turns]),
+        "compute_seconds_per_turn": distribution([turn["compute_seconds"] for turn in turns]),
+    }
+
+
+def run_benchmark(n_games, seed=0, grasp_miss_rate=0.0, frames=None):
+    """Play n_games through robot_turn on the simulated station and summarize every robot turn.
+
+    Turn and phase times are the robot's time on the virtual clock; compute_seconds
+    is the real time the code took, which catches slower vision or planning.
+    """
+    turns = []
+    camera = RecordedCamera(frames, rng=np.random.default_rng(seed)) if frames else None
+    results = replay_games(n_games, seed, grasp_miss_rate, camera=camera,
+                           on_robot_turn=lambda trace, compute: turns.append(measure_turn(trace, compute)))
+    summary = summarize_turns(turns)
+    summary["failed_games"] = sum(result["winner"] is None for result in results)
+    return summary
+
+
+def format_comparison(baseline, current):
+    lines = [f"Compared with {baseline.get('commit') or 'baseline'}:"]
+    rows = [("turn", baseline["turn_seconds"], current["turn_seconds"])]
+    rows += [(f"phase {name}", baseline["phase_seconds"].get(name, {}), stats)
+             for name, stats in current["phase_seconds"].items()]
+    rows.append(("api calls", baseline["api_calls_per_turn"], current["api_calls_per_turn"]))
+    for label, old, new in rows:
+        if "p50" not in old or "p50" not in new:
+            continue
+        change = (new["p50"] - old["p50"]) / old["p50"] if old["p50"] else 0.0
+        lines.append(f"  {label}: p50 {old['p50']:.2f} -> {new['p50']:.2f} ({change:+.1%})")
+    return "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark robot turn latency on the simulated station")
+    parser.add_argument("--games", type=int, default=50)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--grasp-miss-rate", type=float, default=0.0)
+    parser.add_argument("--frames", help="Directory of recorded dice frames named <value>_*.png")
+    parser.add_argument("--output", default="benchmark.json")
+    parser.add_argument("--compare", help="Result file of an earlier run to compare against")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        summary = run_benchmark(args.games, args.seed, args.grasp_miss_rate, args.frames)
+    result = {
+        "commit": git_commit(),
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "settings": {"games": args.games, "seed": args.seed, "grasp_miss_rate": args.grasp_miss_rate,
+                     "frames": args.frames},
+        "elapsed_seconds": round(time.perf_counter() - started, 2),
+        **summary,
+    }
+    with open(args.output, "w") as f:
+        json.dump(result, f, indent=2)
+
+    turn = result["turn_seconds"]
+    print(f"{result['turns']} robot turns in {args.games} games ({result['elapsed_seconds']}s)")
+    if turn["count"]:
+        print(f"Turn time: p50 {turn['p50']:.1f}s, p95 {turn['p95']:.1f}s, max {turn['max']:.1f}s")
+        for name, stats in result["phase_seconds"].items():
+            print(f"  {name}: mean {stats['mean']:.2f}s, p95 {stats['p95']:.2f}s")
+        print(f"API calls per turn: mean {result['api_calls_per_turn']['mean']:.1f}")
+    if result["failed_games"]:
+        print(f"Warning: {result['failed_games']} games ended with a failed robot turn")
+    print(f"Results written to {args.output}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            print(format_comparison(json.load(f), result))
+
+
+if __name__ == "__main__":
+    main()
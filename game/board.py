@@ -0,0 +1,98 @@
+import numpy as np
+
+from config import GAME_CONFIG
+from robot.calibration import CALIBRATION, Pose, check_pose
+
+
+class Board:
+    """Rectangular game board numbered in serpentine order.
+
+    Field poses, the field -> (row, col) index, horizontal neighbors and the
+    ladder/snake lookup are all precomputed here so that every lookup during a
+    game is a plain array access. Field positions come from the grid given by
+    origin, pitch and row_offsets unless field_positions lists an (x, y) per field.
+    """
+
+    def __init__(self, rows, cols, origin, pitch, board_map=None, serpentine=True,
+                 up_z=230, down_z=180, orientation=(0, -180, 180), speed=50, row_offsets=None,
+                 field_positions=None):
+        self.rows = rows
+        self.cols = cols
+        self.fields = rows * cols
+        self.origin = tuple(origin)
+        self.pitch = tuple(pitch)
+        self.serpentine = serpentine
+        self.board_map = dict(board_map or {})
+
+        # Index 0 is unused so that field numbers can be used directly
+        self.field_row = np.zeros(self.fields + 1, dtype=np.int16)
+        self.field_col = np.zeros(self.fields + 1, dtype=np.int16)
+        self.field_at = np.zeros((rows, cols), dtype=np.int16)
+        for field in range(1, self.fields + 1):
+            row, col = divmod(field - 1, cols)
+            if serpentine and row % 2 == 1:
+                col = cols - 1 - col
+            self.field_row[field] = row
+            self.field_col[field] = col
+            self.field_at[row, col] = field
+
+        self.jump = np.arange(self.fields + 1, dtype=np.int16)
+        for start, end in self.board_map.items():
+            self.jump[start] = end
+
+        self.horizontal_neighbors = [()] * (self.fields + 1)
+        self._adjacent = np.zeros((self.fields + 1, self.fields + 1), dtype=bool)
+        for field in range(1, self.fields + 1):
+            row, col = self.field_row[field], self.field_col[field]
+            neighbors = tuple(int(self.field_at[row, c]) for c in (col - 1, col + 1) if 0 <= c < cols)
+            self.horizontal_neighbors[field] = neighbors
+            self._adjacent[field, list(neighbors)] = True
+
+        row_offsets = row_offsets or [0] * rows
+        roll, pitch_angle, yaw = orientation
+        self.poses = [None]
+        for field in range(1, self.fields + 1):
+            if field_positions is not None:
+                x, y = field_positions[field - 1]
+            else:
+                x = origin[0] + self.field_row[field] * pitch[0] + row_offsets[self.field_row[field]]
+                y = origin[1] + self.field_col[field] * pitch[1]
+            up = Pose(int(round(x)), int(round(y)), up_z, roll, pitch_angle, yaw, speed)
+            down = up._replace(z=down_z)
+            check_pose(up, f"field {field} up")
+            check_pose(down, f"field {field} down")
+            self.poses.append({"up": up, "down": down})
+
+    @classmethod
+    def from_config(cls, config):
+        return cls(**config)
+
+    @classmethod
+    def from_calibration(cls, calibration, board_map=None):
+        """Build a station's board from its calibration and the configured ladders and snakes."""
+        if board_map is None:
+            board_map = GAME_CONFIG["board"]["board_map"]
+        return cls(board_map=board_map, **calibration.board)
+
+    def is_valid_field(self, field):
+        return 1 <= field <= self.fields
+
+    def position_of(self, field):
+        """Return the (row, col) of a field, row 0 being the row with field 1."""
+        return int(self.field_row[field]), int(self.field_col[field])
+
+    def apply_rules(self, field):
+        """Return the field reached after a ladder or snake on the given field."""
+        return int(self.jump[field])
+
+    def is_horizontally_adjacent(self, field1, field2):
+        if not (self.is_valid_field(field1) and self.is_valid_field(field2)):
+            return False
+        return bool(self._adjacent[field1, field2])
+
+    def field_pose(self, field, level):
+        """Return the "up" or "down" Pose of a field."""
+        return self.poses[field][level]
+
+
+BOARD = Board.from_calibration(CALIBRATION)
@@ -1,352 +1,504 @@
-import time
-from config import GAME_CONFIG
-from vision.dice_detector import get_dice_value_from_camera
+import clock
+from config import COLLISION_RESET, GAME_CONFIG, STREAM_URL
+from game.board import BOARD
+from game.motion_plans import estimate_move, get_plan_cache
+import profiling
+from metrics import TURN_SECONDS
+from robot.calibration import POSES
+from robot.gripper import grab_dice, grasp, release_object
+from vision.board_state import confirm_move, verify_positions
 
+CAMERA_RECOVERY_TIMEOUT = 20
+
+
+def console_log(message, category='robot'):
+    print(message)
+
+
+def console_confirm(message):
+    input(message + " Press ENTER to continue...")
+
+
+def manual_dice_fallback(log):
+    """Ask for the robot's dice value on the console. Returns None if the user gives up."""
+    log("Automatic detection failed. Please enter value manually.", 'robot')
+    dice_value = get_dice_input()
+    if dice_value == 0:
+        return None
+    return dice_value
+
+
+def fixed_dice_fallback(value):
+    """Fallback policy that plays a fixed value when the dice cannot be read."""
+    def fallback(log):
+        log(f"Automatic detection failed. Using default value {value}.", 'robot')
+        return value
+    return fallback
+
+
+class TurnPorts:
+    """The I/O a front end plugs into the turn engine.
+
+    log(message, category) receives every progress message, confirm(message) blocks
+    until a human has done what the message asks, and dice_fallback(log) returns a
+    dice value (or None to abort the turn) when the camera cannot read the dice.
+    """
+
+    def __init__(self, log=console_log, confirm=console_confirm, dice_fallback=manual_dice_fallback):
+        self.log = log
+        self.confirm = confirm
+        self.dice_fallback = dice_fallback
+
+
+class RobotTurnEngine:
+    """Plays one robot turn as a state machine; every state is timed as a turn phase."""
+
+    DONE = "done"
+    FAILED = "failed"
+
+    def __init__(self, client, token, game_state, ports=None, prepared=False, journal=None, camera_url=STREAM_URL,
+                 dice_picker=None, board_watcher=None, poses=POSES):
+        self.client = client
+        self.token = token
+        self.game_state = game_state
+        self.board = game_state.board
+        self.poses = poses
+        self.camera_url = camera_url
+        self.dice_picker = dice_picker
+        self.board_watcher = board_watcher
+        self.ports = ports or TurnPorts()
+        self.prepared = prepared
+        self.journal = journal
+        self.log = self.ports.log
+
+        self.old_position = game_state.get_robot_position()
+        self.dice_value = None
+        self.new_position = None
+        self.dice_pick = None
+
+        self.handlers = {
+            "throw": self.throw,
+            "settle": self.settle,
+            "detect": self.detect,
+            "fallback": self.fallback,
+            "resolve": self.resolve,
+            "reset_player": self.reset_player,
+            "move_figure": self.move_figure,
+            "fetch_dice": self.fetch_dice,
+            "home": self.home,
+        }
+
+    def run(self, resume=None):
+        """Play the turn, or finish an interrupted one from the context load_resume_point() rebuilt."""
+        self.log("="*50, 'system')
+        self.log("ROBOT'S TURN", 'robot')
+        self.log("="*50, 'system')
+
+        if resume is None:
+            self._record("robot_turn_started", old_position=self.old_position)
+            state = "throw"
+        else:
+            state = self.resume_from(resume)
+        self.log(f"Robot's current position: Field {self.old_position}", 'robot')
+        self.log(f"Player's current position: Field {self.game_state.get_player_position()}", 'robot')
+
+        while state not in (self.DONE, self.FAILED):
+            self._record("phase_started", phase=state)
+            with profiling.phase(state):
+                next_state = self.handlers[state]()
+            self._record("phase_done", phase=state, next=next_state,
+                         dice_value=self.dice_value, new_position=self.new_position)
+            state = next_state
+
+        if state == self.DONE:
+            self._record("robot_turn_done")
+            self.log("Robot's turn complete!", 'robot')
+        return state == self.DONE
+
+    def resume_from(self, context):
+        """Restore the turn's context and return the state to continue with."""
+        self.old_position = context["old_position"]
+        self.dice_value = context["dice_value"]
+        self.new_position = context["new_position"]
+        interrupted = context["interrupted"]
+        self.log(f"Resuming the robot's turn at '{interrupted or context['next']}'...", 'robot')
+
+        if interrupted in ("resolve", "reset_player"):
+            # The move may have been applied just before the crash
+            if self.game_state.is_game_over() or self.game_state.get_robot_position() != self.old_position:
+                self.new_position = self.game_state.get_robot_position()
+                return self.DONE if self.game_state.is_game_over() else "move_figure"
+            if interrupted == "reset_player" and self.game_state.get_player_position() != 1:
+                # The player's figure may still be in the gripper, only a human can finish the reset
+                release_object(self.client, self.token)
+                self._confirm_move({"player": 1, "robot": self.old_position},
+                                   "The robot stopped while resetting the player's character. "
+                                   "Please put the player's character on field 1.")
+                self.game_state.reset_player_position()
+            return "resolve"
+        if interrupted == "move_figure":
+            # The figure may be anywhere between the two fields, only a human can tell
+            self._confirm_move({"robot": self.new_position},
+                               f"The robot stopped while moving its character. "
+                               f"Please put the robot's character on field {self.new_position}.")
+            return "home"
+
+        state = interrupted or context["next"]
+        if state == "fetch_dice":
+            # Where the dice landed is not journaled, and it may still be in the gripper
+            release_object(self.client, self.token)
+            self.ports.confirm("Please put the dice back at its start position.")
+            return "home"
+        if state == "throw":
+            # The dice may still be in the gripper
+            release_object(self.client, self.token)
+        return state
+
+    def _confirm_move(self, expected, message):
+        confirm_move(self.board_watcher, expected, message, self.log, self.ports.confirm)
+
+    def _record(self, event, **data):
+        if self.journal is not None:
+            self.journal.record(event, **data)
+
+    def throw(self):
+        # The robot is at the default position from initialization or the previous turn,
+        # or already above the dice if it was prepared during the player's turn
+        self.log("Step 1: Throwing dice...", 'robot')
+        if not throw_dice(self.client, self.token, log=self.log, from_up=self.prepared, poses=self.poses):
+            self.log("Failed to throw dice", 'robot')
+            return self.FAILED
+        return "settle"
+
+    def settle(self):
+        self.log("Step 2: Returning to default position after throw...", 'robot')
+        if not move_to_default_position(self.client, self.token, self.poses):
+            self.log("Failed to return to default position", 'robot')
+            return self.FAILED
+        profiling.sleep(3)
+        return "detect"
+
+    def detect(self):
+        self.log("Step 3: Detecting dice value from camera...", 'robot')
+        # Imported here so OpenCV is not loaded before the robot login; the startup code preloads it
+        from vision.dice_detector import read_dice_from_camera
+        reading = read_dice_from_camera(wait_time=2, max_attempts=5, display_video=False, stream_url=self.camera_url)
+
+        # Give a dropped stream a chance to come back before falling back
+        if reading is None:
+            reading = retry_detection_after_recovery(self.log, self.camera_url)
+        if reading is None:
+            return "fallback"
+
+        self.dice_value = reading.value
+        if self.dice_picker is not None:
+            self.dice_pick = self.dice_picker.pick_poses(reading.center)
+            if self.dice_pick is None:
+                self.log("The dice landed outside the pick area, it has to be put back by hand.", 'robot')
+        return "resolve"
+
+    def fallback(self):
+        self.dice_value = self.ports.dice_fallback(self.log)
+        if self.dice_value is None:
+            self.log("Invalid dice value, skipping turn", 'robot')
+            return self.FAILED
+        return "resolve"
+
+    def resolve(self):
+        self.log(f"Robot rolled: {self.dice_value}", 'robot')
+
+        # Step 4: Check for collision BEFORE moving
+        target_field = self.old_position + self.dice_value
+        if target_field == self.game_state.get_player_position() and target_field < self.game_state.max_field:
+            self.log(f"Collision detected! Robot would land on field {target_field} where the player is.", 'robot')
+            return "reset_player"
+        return self._advance()
+
+    def reset_player(self):
+        reset_figure(self.client, self.token, "player", self.game_state.get_player_position(), self.old_position,
+                     self.log, self.ports.confirm, self.board, self.board_watcher, return_home=False,
+                     poses=self.poses)
+        self.game_state.reset_player_position()
+        self.log("Player's character has been reset to field 1.", 'system')
+        return self._advance()
+
+    def _advance(self):
+        self.new_position = self.game_state.move_robot(self.dice_value)
+        if self.new_position is None:
+            self.log("Unexpected collision state. Skipping turn.", 'robot')
+            return self.FAILED
+
+        if self.game_state.is_game_over():
+            return self.DONE
+        return "move_figure"
+
+    def move_figure(self):
+        # move_robot returns the field after a ladder or snake; the figure first goes where the roll landed
+        old_position, new_position = self.old_position, self.old_position + self.dice_value
+        self.log(f"Step 5: Moving robot's character from field {old_position} to field {self.new_position}...", 'robot')
+
+        player_position = self.game_state.get_player_position()
+        plans = get_plan_cache(self.board).move_plans(old_position, new_position, player_position)
+        self.log(f"Estimated time for the move: {estimate_move(plans):.0f}s", 'robot')
+
+        if not self.game_state.check_special_field(new_position):
+            if not move_robot_figure(self.client, self.token, old_position, new_position, player_position, log=self.log, board=self.board):
+                self.log("Failed to move robot figure", 'robot')
+                return self.FAILED
+            return self._after_move()
+
+        final_position = self.game_state.get_special_field_target(new_position)
+
+        # First, move to the intermediate position (where the dice landed)
+        self.log(f"Moving character to intermediate field {new_position}...", 'robot')
+        if not move_robot_figure(self.client, self.token, old_position, new_position, player_position, log=self.log, board=self.board):
+            self.log("Failed to move robot figure to intermediate position", 'robot')
+            return self.FAILED
+
+        self.log("Returning to default position...", 'robot')
+        if not move_to_default_position(self.client, self.token, self.poses):
+            self.log("Failed to return to default position", 'robot')
+            return self.FAILED
+        profiling.sleep(3)
 
-def robot_turn(client, token, game_state):
-    print("\n" + "="*50)
-    print("ROBOT'S TURN")
-    print("="*50)
-    
-    old_position = game_state.get_robot_position()
-    print(f"Robot's current position: Field {old_position}")
-    print(f"Player's current position: Field {game_state.get_player_position()}")
-    
-    # Step 1: Throw dice (robot is already at default position from initialization or previous turn)
-    print("\nStep 1: Throwing dice...")
-    if not throw_dice(client, token):
-        print("Failed to throw dice")
-        return False
-    
-    # Step 2: Return to default position after throwing
-    print("\nStep 2: Returning to default position after throw...")
-    if not move_to_default_position(client, token):
-        print("Failed to return to default position")
-        return False
-    time.sleep(3)
-    
-    # Step 3: Detect dice value automatically using camera
-    print("\nStep 3: Detecting dice value from camera...")
-    dice_value = get_dice_value_from_camera(wait_time=2, max_attempts=5, display_video=False)
-    
-    if dice_value is None:
-        print("Automatic detection failed. Please enter value manually.")
-        dice_value = get_dice_input()
-        if dice_value == 0:
-            print("Invalid dice value, skipping turn")
-            return False
-    
-    print(f"\nRobot rolled: {dice_value}")
-    
-    # Step 4: Check for collision BEFORE moving
-    target_field = old_position + dice_value
-    if target_field == game_state.get_player_position() and target_field < game_state.max_field:
-        print(f"\nCollision detected! Robot would land on field {target_field} where the player is.")
-        print("Please move the player's character back to field 1 on the physical board.")
-        input("Press ENTER when you have moved the player's character to field 1...")
-        game_state.player_position = 1
-        print("Player's character has been reset to field 1.")
-    
-    # Calculate new position
-    new_position = game_state.move_robot(dice_value)
-    
-    # Handle unexpected collision return
-    if new_position is None:
-        print("Unexpected collision state. Skipping turn.")
-        return False
-    
-    # Check if game is over
-    if game_state.is_game_over():
-        return True
-    
-    # Step 5: Move robot's character
-    print(f"\nStep 5: Moving robot's character from field {old_position} to field {new_position}...")
-    
-    player_position = game_state.get_player_position()
-    
-    # Check if it's a special field (ladder or snake)
-    if game_state.check_special_field(new_position):
-        final_position = game_state.get_special_field_target(new_position)
-        
-        # First, move to the intermediate position (where dice landed)
-        print(f"Moving character to intermediate field {new_position}...")
-        if not move_robot_figure(client, token, old_position, new_position, player_position):
-            print("Failed to move robot figure to intermediate position")
-            return False
-        
-        # Return to default
-        print("\nReturning to default position...")
-        if not move_to_default_position(client, token):
-            print("Failed to return to default position")
-            return False
-        time.sleep(3)
-        
-        # Announce special field
         if final_position > new_position:
-            print(f"\nLadder! Robot climbs from field {new_position} to field {final_position}!")
+            self.log(f"Ladder! Robot climbs from field {new_position} to field {final_position}!", 'robot')
         else:
-            print(f"\nSnake! Robot slides down from field {new_position} to field {final_position}!")
-        
-        # Then move to the final position
-        print(f"Moving character to final field {final_position}...")
-        if not move_robot_figure(client, token, new_position, final_position, player_position):
-            print("Failed to move robot figure to final position")
-            return False
-    else:
-        # Normal move (no special field)
-        if not move_robot_figure(client, token, old_position, new_position, player_position):
-            print("Failed to move robot figure")
-            return False
-    
-    # Step 6: Return to default position after moving character
-    print("\nStep 6: Returning to default position...")
-    if not move_to_default_position(client, token):
-        print("Failed to return to default position")
-        return False
-    
-    print("\nRobot's turn complete!")
-    return True
+            self.log(f"Snake! Robot slides down from field {new_position} to field {final_position}!", 'robot')
+
+        self.log(f"Moving character to final field {final_position}...", 'robot')
+        if not move_robot_figure(self.client, self.token, new_position, final_position, player_position, log=self.log, board=self.board):
+            self.log("Failed to move robot figure to final position", 'robot')
+            return self.FAILED
+        return self._after_move()
+
+    def _after_move(self):
+        return "fetch_dice" if self.dice_pick is not None else "home"
+
+    def fetch_dice(self):
+        """Bring the dice from where the camera saw it back to its start position for the next throw."""
+        self.log("Fetching the dice for the next throw...", 'robot')
+        picker = self.dice_picker
+        if not carry_dice(self.client, self.token, self.dice_pick[1], picker.rest_pose, picker.lift_z, self.log):
+            # Not worth failing the turn over; the next throw just needs the dice back in place
+            release_object(self.client, self.token)
+            self.log("Could not fetch the dice. Please put it back at its start position.", 'robot')
+        return "home"
+
+    def home(self):
+        self.log("Step 6: Returning to default position...", 'robot')
+        if not move_to_default_position(self.client, self.token, self.poses):
+            self.log("Failed to return to default position", 'robot')
+            return self.FAILED
+        # With the arm out of the way, check that the figures stand where the game thinks
+        verify_positions(self.board_watcher, self.game_state, self.log)
+        return self.DONE
+
+
+def robot_turn(client, token, game_state, ports=None, preparer=None, journal=None, resume=None, camera_url=STREAM_URL,
+               dice_picker=None, board_watcher=None, poses=POSES):
+    """Play the robot's turn. A running IdlePreparer is finished first so the throw can start mid-sequence.
+
+    With a GameJournal every phase is recorded; resume continues a turn that was
+    interrupted by a crash. With a DicePicker the robot fetches the dice from where
+    it landed instead of leaving that to a human; with a BoardWatcher the board
+    camera confirms figures put back by hand and checks the board after the move.
+    poses are the arm poses of the station's calibration.
+    """
+    turn_started = clock.now()
+    profiling.start_turn()
+    try:
+        prepared = preparer.finish() if preparer is not None else False
+        engine = RobotTurnEngine(client, token, game_state, ports, prepared, journal, camera_url, dice_picker,
+                                 board_watcher, poses)
+        completed = engine.run(resume)
+    finally:
+        profiling.finish_turn()
+    if completed:
+        TURN_SECONDS.observe(clock.now() - turn_started)
+    return completed
+
+
+def retry_detection_after_recovery(log=console_log, camera_url=STREAM_URL):
+    """Wait for an unhealthy camera stream to reconnect and read the dice again."""
+    from vision.camera import get_camera
+    from vision.dice_detector import read_dice_from_camera
+
+    camera = get_camera(camera_url)
+    if camera.is_healthy():
+        return None
+
+    log(f"Camera stream unhealthy ({camera.describe_health()}). Waiting up to {CAMERA_RECOVERY_TIMEOUT}s for recovery...", 'robot')
+    if not camera.wait_until_healthy(timeout=CAMERA_RECOVERY_TIMEOUT):
+        log("Camera stream did not recover.", 'robot')
+        return None
+
+    log("Camera stream recovered. Detecting dice value again...", 'robot')
+    return read_dice_from_camera(wait_time=0, max_attempts=5, display_video=False, stream_url=camera_url)
 
 
 def move_to_position(client, token, position):
-    return client.set_tcp_target(
-        token,
-        position["x"],
-        position["y"],
-        position["z"],
-        position["roll"],
-        position["pitch"],
-        position["yaw"],
-        position["speed"]
-    )
+    with profiling.span("move_to_position", "motion", x=position.x, y=position.y, z=position.z, yaw=position.yaw):
+        return client.set_tcp_target(token, *position)
 
 
-def move_to_default_position(client, token):
-    default_pos = GAME_CONFIG["default_position"]
-    return move_to_position(client, token, default_pos)
+def move_to_default_position(client, token, poses=POSES):
+    return move_to_position(client, token, poses.default_position)
 
 
-def throw_dice(client, token):
-    """Execute the dice throwing sequence."""
+def throw_dice(client, token, log=console_log, from_up=False, poses=POSES):
+    """Execute the dice throwing sequence; from_up skips the approach when the arm is already above the dice."""
     # Move to dice position (up)
-    print("  - Moving to dice position (up)...")
-    dice_pos_up = GAME_CONFIG["dice_position_up"]
-    if not move_to_position(client, token, dice_pos_up):
-        return False
-    time.sleep(3)
+    dice_pos_up = poses.dice_position_up
+    if not from_up:
+        log("  - Moving to dice position (up)...", 'robot')
+        if not move_to_position(client, token, dice_pos_up):
+            return False
+        profiling.sleep(3)
     
     # Lower to dice position
-    print("  - Lowering to dice...")
-    dice_pos_down = GAME_CONFIG["dice_position_down"]
+    log("  - Lowering to dice...", 'robot')
+    dice_pos_down = poses.dice_position_down
     if not move_to_position(client, token, dice_pos_down):
         return False
-    time.sleep(3)
+    profiling.sleep(3)
     
     # Close gripper to grab dice
     gripper_value = GAME_CONFIG["gripper_closed_dice"]
-    print(f"  - Closing gripper to grab dice (value: {gripper_value})...")
-    if not client.set_gripper_value(token, gripper_value):
+    log(f"  - Closing gripper to grab dice (value: {gripper_value})...", 'robot')
+    if not grab_dice(client, token, log):
         return False
-    time.sleep(1)
     
     # Lift dice
-    print("  - Lifting dice...")
+    log("  - Lifting dice...", 'robot')
     if not move_to_position(client, token, dice_pos_up):
         return False
-    time.sleep(3)
+    profiling.sleep(3)
     
     # Move to throw position
-    print("  - Moving to throw position...")
-    dice_throw_pos = GAME_CONFIG["dice_throw_position"]
+    log("  - Moving to throw position...", 'robot')
+    dice_throw_pos = poses.dice_throw_position
     if not move_to_position(client, token, dice_throw_pos):
         return False
-    time.sleep(6)
+    profiling.sleep(6)
     
     # Open gripper to throw dice
-    print("  - Opening gripper to throw dice...")
-    if not client.set_gripper_value(token, GAME_CONFIG["gripper_open"]):
+    log("  - Opening gripper to throw dice...", 'robot')
+    if not release_object(client, token):
         return False
-    time.sleep(1)
     
     # Return to up position
-    print("  - Returning to up position...")
+    log("  - Returning to up position...", 'robot')
     if not move_to_position(client, token, dice_pos_up):
         return False
-    time.sleep(3)
+    profiling.sleep(3)
     
     return True
 
 
+def carry_dice(client, token, from_pose, to_pose, lift_z, log=console_log):
+    """Pick the dice up at from_pose and put it down at to_pose, both at table height, lifting it to lift_z."""
+    for message, pose in (("  - Moving above the dice...", from_pose._replace(z=lift_z)),
+                          ("  - Lowering to the dice...", from_pose)):
+        log(message, 'robot')
+        if not move_to_position(client, token, pose):
+            return False
+        profiling.sleep(3)
+
+    if not grab_dice(client, token, log):
+        return False
+
+    for message, pose in (("  - Lifting dice...", from_pose._replace(z=lift_z)),
+                          ("  - Carrying dice...", to_pose._replace(z=lift_z)),
+                          ("  - Lowering dice...", to_pose)):
+        log(message, 'robot')
+        if not move_to_position(client, token, pose):
+            return False
+        profiling.sleep(3)
+
+    log("  - Releasing dice...", 'robot')
+    if not release_object(client, token):
+        return False
+    log("  - Lifting from the dice...", 'robot')
+    if not move_to_position(client, token, to_pose._replace(z=lift_z)):
+        return False
+    profiling.sleep(3)
+    return True
+
+
+def reset_figure(client, token, figure, from_field, other_field, log=console_log, confirm=console_confirm,
+                 board=BOARD, board_watcher=None, return_home=True, poses=POSES):
+    """Put a figure sent home by a collision back on field 1.
+
+    With COLLISION_RESET set to "robot" the arm carries it there on a path planned
+    around the other figure; a human is only asked when the robot cannot do it.
+    """
+    other = "player" if figure == "robot" else "robot"
+    if COLLISION_RESET == "robot" and carry_figure_home(client, token, from_field, other_field, log, board):
+        if return_home:
+            move_to_default_position(client, token, poses)
+        return
+    # Out of the way of the board camera and of the human doing the reset
+    move_to_default_position(client, token, poses)
+    confirm_move(board_watcher, {figure: 1, other: other_field},
+                 f"Please move the {figure}'s character back to field 1 on the physical board.", log, confirm)
+
+
+def carry_figure_home(client, token, from_field, other_field, log=console_log, board=BOARD):
+    """Carry the figure on from_field to field 1 with the arm. Returns False if it could not."""
+    # Both figures share field 1 at the start, but the arm would put one down on top of the other
+    if other_field == 1:
+        log("The other character stands on field 1, so this one has to be reset by hand.", 'robot')
+        return False
+    log(f"Carrying the character from field {from_field} back to field 1...", 'robot')
+    plan = get_plan_cache(board).get(from_field, 1, other_field)
+    if execute_plan(client, token, plan, log):
+        return True
+    # The figure may still be in the gripper
+    release_object(client, token)
+    log("The robot could not reset the character.", 'robot')
+    return False
+
+
 def is_horizontally_adjacent(field1, field2):
     """Check if two fields are horizontally adjacent."""
-    # Field layout: 5 columns, 6 rows
-    # [[30,29,28,27,26], [21,22,23,24,25], [20,19,18,17,16], 
-    #  [11,12,13,14,15], [10,9,8,7,6], [1,2,3,4,5]]
-    
-    # Fields in the same row and adjacent
-    rows = [
-        list(range(1, 6)),      # 1-5
-        list(range(6, 11)),     # 6-10
-        list(range(11, 16)),    # 11-15
-        list(range(16, 21)),    # 16-20
-        list(range(21, 26)),    # 21-25
-        list(range(26, 31))     # 26-30
-    ]
-    
-    for row in rows:
-        if field1 in row and field2 in row:
-            # Check if they are next to each other
-            if abs(field1 - field2) == 1:
-                return True
-    
-    return False
+    return BOARD.is_horizontally_adjacent(field1, field2)
 
 
-def move_robot_figure(client, token, from_field, to_field, player_field=None):
+def move_robot_figure(client, token, from_field, to_field, player_field=None, log=console_log, board=BOARD):
     """Move robot's character from one field to another."""
-    if from_field < 1 or from_field > len(GAME_CONFIG["game_fields"]):
+    if not board.is_valid_field(from_field):
         return False
-    if to_field < 1 or to_field > len(GAME_CONFIG["game_fields"]):
+    if not board.is_valid_field(to_field):
         return False
     
-    # Check if player is horizontally adjacent to source field
-    use_alternative_yaw_from = False
-    if player_field and is_horizontally_adjacent(from_field, player_field):
-        use_alternative_yaw_from = True
-        print(f"  - Player is horizontally adjacent to source field {from_field}, using alternative approach angle for pickup...")
-    
-    # Check if player is horizontally adjacent to target field
-    use_alternative_yaw_to = False
-    if player_field and is_horizontally_adjacent(to_field, player_field):
-        use_alternative_yaw_to = True
-        print(f"  - Player is horizontally adjacent to target field {to_field}, using alternative approach angle for placement...")
-    
-    # Get source field positions
-    from_field_data = GAME_CONFIG["game_fields"][from_field - 1]
-    from_field_up = from_field_data["up"].copy()
-    from_field_down = from_field_data["down"].copy()
+    plan = get_plan_cache(board).get(from_field, to_field, player_field)
     
-    # Get target field positions
-    to_field_data = GAME_CONFIG["game_fields"][to_field - 1]
-    to_field_up = to_field_data["up"].copy()
-    to_field_down = to_field_data["down"].copy()
-    
-    # Create alternative yaw positions for source field if needed
-    if use_alternative_yaw_from:
-        from_field_up_alt_yaw = from_field_up.copy()
-        from_field_up_alt_yaw["yaw"] = 90
-        from_field_down_alt_yaw = from_field_down.copy()
-        from_field_down_alt_yaw["yaw"] = 90
-    
-    # Create alternative yaw positions for target field if needed
-    if use_alternative_yaw_to:
-        to_field_up_alt_yaw = to_field_up.copy()
-        to_field_up_alt_yaw["yaw"] = 90
-        to_field_down_alt_yaw = to_field_down.copy()
-        to_field_down_alt_yaw["yaw"] = 90
-    
-    # Pick up character from current position
-    if use_alternative_yaw_from:
-        # Use alternative yaw for pickup
-        print(f"  - Moving above field {from_field}...")
-        if not move_to_position(client, token, from_field_up):
-            return False
-        time.sleep(3)
-        
-        print(f"  - Adjusting to alternative angle (yaw 90) for pickup...")
-        if not move_to_position(client, token, from_field_up_alt_yaw):
-            return False
-        time.sleep(10)
-        
-        print(f"  - Lowering to field {from_field} with alternative angle...")
-        if not move_to_position(client, token, from_field_down_alt_yaw):
-            return False
-        time.sleep(3)
-        
-        print("  - Closing gripper to grab character...")
-        if not client.set_gripper_value(token, GAME_CONFIG["gripper_closed_figur"]):
-            return False
-        time.sleep(1)
-        
-        print(f"  - Lifting character from field {from_field} with alternative angle...")
-        if not move_to_position(client, token, from_field_up_alt_yaw):
-            return False
-        time.sleep(1)
-    else:
-        # Normal pickup
-        print(f"  - Moving above field {from_field}...")
-        if not move_to_position(client, token, from_field_up):
-            return False
-        time.sleep(3)
-        
-        print(f"  - Lowering to field {from_field}...")
-        if not move_to_position(client, token, from_field_down):
-            return False
-        time.sleep(3)
-        
-        print("  - Closing gripper to grab character...")
-        if not client.set_gripper_value(token, GAME_CONFIG["gripper_closed_figur"]):
-            return False
-        time.sleep(1)
-        
-        print(f"  - Lifting character from field {from_field}...")
-        if not move_to_position(client, token, from_field_up):
-            return False
-        time.sleep(1)
-    
-    # Move to target position
-    if use_alternative_yaw_to:
-        # First move to normal up position
-        print(f"  - Moving above field {to_field}...")
-        if not move_to_position(client, token, to_field_up):
-            return False
-        time.sleep(3)
-        
-        # Then adjust to alternative yaw (90 degrees)
-        print(f"  - Adjusting to alternative angle (yaw 90)...")
-        if not move_to_position(client, token, to_field_up_alt_yaw):
-            return False
-        time.sleep(10)
-        
-        # Lower with alternative yaw
-        print(f"  - Lowering to field {to_field} with alternative angle...")
-        if not move_to_position(client, token, to_field_down_alt_yaw):
-            return False
-        time.sleep(3)
-        
-        # Open gripper
-        print("  - Opening gripper to release character...")
-        if not client.set_gripper_value(token, GAME_CONFIG["gripper_open"]):
-            return False
-        time.sleep(1)
-        
-        # Lift with alternative yaw
-        print(f"  - Lifting from field {to_field} with alternative angle...")
-        if not move_to_position(client, token, to_field_up_alt_yaw):
-            return False
-        time.sleep(1)
-    else:
-        # Normal approach
-        print(f"  - Moving above field {to_field}...")
-        if not move_to_position(client, token, to_field_up):
-            return False
-        time.sleep(3)
-        
-        print(f"  - Lowering to field {to_field}...")
-        if not move_to_position(client, token, to_field_down):
-            return False
-        time.sleep(3)
-        
-        print("  - Opening gripper to release character...")
-        if not client.set_gripper_value(token, GAME_CONFIG["gripper_open"]):
-            return False
-        time.sleep(1)
-        
-        print(f"  - Lifting from field {to_field}...")
-        if not move_to_position(client, token, to_field_up):
-            return False
-        time.sleep(1)
+    # Check if player is horizontally adjacent to source or target field
+    if plan.alternative_from:
+        log(f"  - Player is horizontally adjacent to source field {from_field}, using alternative approach angle for pickup...", 'robot')
+    if plan.alternative_to:
+        log(f"  - Player is horizontally adjacent to target field {to_field}, using alternative approach angle for placement...", 'robot')
     
+    return execute_plan(client, token, plan, log)
+
+
+def execute_plan(client, token, plan, log=console_log):
+    """Run a precomputed motion plan step by step."""
+    with profiling.span("motion_plan", "motion", from_field=plan.from_field, to_field=plan.to_field,
+                        estimated_seconds=plan.estimated_seconds):
+        for step in plan.steps:
+            log(step.message, 'robot')
+            if step.action == "move":
+                if not move_to_position(client, token, step.target):
+                    return False
+                profiling.sleep(step.settle)
+            # Gripper steps wait on the gripper's own feedback instead of a fixed settle time
+            elif step.action == "grasp":
+                if not grasp(client, token, step.target, log):
+                    return False
+            elif not release_object(client, token):
+                return False
     return True
 
 
@@ -1,37 +1,84 @@
+from typing import NamedTuple, Optional
+
+from game.board import BOARD
+
+
+class GameSnapshot(NamedTuple):
+    version: int
+    player_position: int
+    robot_position: int
+    current_turn: str
+    game_over: bool
+    winner: Optional[str]
+
+
 class GameState:
 
-    BOARD_MAP = {
-        # Ladders (Upward movement)
-        3: 7,
-        11: 19,
-        15: 23,
-        
-        # Snakes (Downward movement)
-        29: 20,
-        27: 16,
-        18: 10,
-        6: 4,
-    }
+    __slots__ = (
+        "board", "player_position", "robot_position", "current_turn",
+        "game_over", "winner", "max_field", "version", "_snapshot", "_listeners",
+    )
+
+    BOARD_MAP = BOARD.board_map
 
-    def __init__(self):
+    def __init__(self, board=BOARD):
+        self.board = board
         self.player_position = 1
         self.robot_position = 1
         self.current_turn = "player"
         self.game_over = False
         self.winner = None
-        self.max_field = 30
+        self.max_field = board.fields
+        self.version = 0
+        self._listeners = []
+        self._publish()
+
+    @classmethod
+    def from_snapshot(cls, snapshot, board=BOARD):
+        """Rebuild a game from a snapshot, e.g. one read back from the game journal."""
+        state = cls(board)
+        state.player_position = snapshot.player_position
+        state.robot_position = snapshot.robot_position
+        state.current_turn = snapshot.current_turn
+        state.game_over = snapshot.game_over
+        state.winner = snapshot.winner
+        state.version = snapshot.version - 1
+        state._publish()
+        return state
+
+    def add_listener(self, callback):
+        """Call callback(snapshot) after every published change."""
+        self._listeners.append(callback)
+
+    def _publish(self):
+        """Bump the version and replace the snapshot once a mutation is complete."""
+        self.version += 1
+        self._snapshot = GameSnapshot(
+            self.version,
+            self.player_position,
+            self.robot_position,
+            self.current_turn,
+            self.game_over,
+            self.winner,
+        )
+        for callback in self._listeners:
+            callback(self._snapshot)
+
+    def snapshot(self):
+        """Return an immutable, consistent view of the state. Safe to call from any thread."""
+        return self._snapshot
 
     def _apply_board_rules(self, position):
         """Checks if the position is a ladder or snake head and returns the new position."""
-        return self.BOARD_MAP.get(position, position)
+        return self.board.apply_rules(position)
     
     def check_special_field(self, position):
         """Check if a position has a ladder or snake."""
-        return position in self.BOARD_MAP
+        return position in self.board.board_map
     
     def get_special_field_target(self, position):
         """Get the target field for a ladder or snake."""
-        return self.BOARD_MAP.get(position, position)
+        return self.board.apply_rules(position)
     
     def move_player(self, steps):
         old_position = self.player_position
@@ -42,6 +89,7 @@ class GameState:
             self.player_position = self.max_field
             self.game_over = True
             self.winner = "player"
+            self._publish()
             return self.player_position
         
         # 2. Check for collision BEFORE moving - return None to signal collision
@@ -68,6 +116,7 @@ class GameState:
             print("Robot's character is being sent back to field 1!")
             self.robot_position = 1
         
+        self._publish()
         return self.player_position
     
     def move_robot(self, steps):
@@ -79,6 +128,7 @@ class GameState:
             self.robot_position = self.max_field
             self.game_over = True
             self.winner = "robot"
+            self._publish()
             return self.robot_position
         
         # 2. Check for collision with player BEFORE moving
@@ -92,17 +142,25 @@ class GameState:
         final_position = self._apply_board_rules(self.robot_position)
         
         self.robot_position = final_position
+        self._publish()
         return self.robot_position
     
     def reset_robot_position(self):
         """Reset robot position to field 1 after collision."""
         self.robot_position = 1
+        self._publish()
+    
+    def reset_player_position(self):
+        """Reset player position to field 1 after collision."""
+        self.player_position = 1
+        self._publish()
     
     def switch_turn(self):
         if self.current_turn == "player":
             self.current_turn = "robot"
         else:
             self.current_turn = "player"
+        self._publish()
     
     def is_game_over(self):
         return self.game_over
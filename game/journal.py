@@ -0,0 +1,136 @@
+import json
+import os
+import threading
+from typing import NamedTuple, Optional
+
+import clock
+from config import JOURNAL_FILE
+from game.game_state import GameSnapshot
+
+
+class GameJournal:
+    """Append-only JSONL record of one game.
+
+    Every state change and robot turn phase is written and flushed right away, so
+    a crashed process loses nothing that reached the OS. fsync is batched by a
+    background thread every sync_interval seconds; events passed with durable=True
+    (game start and end) are synced before record() returns.
+    """
+
+    def __init__(self, path=JOURNAL_FILE, sync_interval=0.2, fresh=True):
+        self.path = path
+        self.sync_interval = sync_interval
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._file = open(path, "w" if fresh else "a", encoding="utf-8")
+        self._lock = threading.Lock()
+        self._dirty = False
+        self._closed = threading.Event()
+        self._syncer = threading.Thread(target=self._sync_loop, daemon=True)
+        self._syncer.start()
+
+    def record(self, event, durable=False, **data):
+        line = json.dumps(dict(data, event=event, time=round(clock.wall_time(), 3)))
+        with self._lock:
+            if self._file.closed:
+                return
+            self._file.write(line + "\n")
+            self._file.flush()
+            self._dirty = True
+        if durable:
+            self.sync()
+
+    def attach(self, game_state):
+        """Record every snapshot the game state publishes from now on."""
+        game_state.add_listener(lambda snapshot: self.record("state", **snapshot._asdict()))
+        self.record("state", **game_state.snapshot()._asdict())
+
+    def sync(self):
+        with self._lock:
+            if self._file.closed or not self._dirty:
+                return
+            os.fsync(self._file.fileno())
+            self._dirty = False
+
+    def close(self):
+        self._closed.set()
+        self.sync()
+        with self._lock:
+            self._file.close()
+
+    def _sync_loop(self):
+        while not self._closed.wait(self.sync_interval):
+            self.sync()
+
+
+class ResumePoint(NamedTuple):
+    """Where an interrupted game stopped, rebuilt from its journal."""
+    snapshot: GameSnapshot
+    session_id: Optional[str]
+    token: Optional[str]
+    # The current side finished its move but the turn had not been passed on yet
+    turn_finished: bool
+    # Engine context of an unfinished robot turn, see RobotTurnEngine.resume_from
+    robot_turn: Optional[dict]
+    # {"from_field", "player_field"} of a collision reset of the robot's figure that did not finish
+    figure_reset: Optional[dict]
+
+
+def read_events(path=JOURNAL_FILE):
+    """Yield the journal's events, ignoring a last line cut off by a crash."""
+    if not os.path.exists(path):
+        return
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                yield json.loads(line)
+            except ValueError:
+                break
+
+
+def load_resume_point(path=JOURNAL_FILE):
+    """Return the ResumePoint of an unfinished game in the journal, or None."""
+    snapshot = None
+    session_id = None
+    token = None
+    turn_finished = False
+    robot_turn = None
+    figure_reset = None
+
+    for entry in read_events(path):
+        event = entry["event"]
+        if event == "game_started":
+            snapshot, token, turn_finished, robot_turn = None, entry.get("token"), False, None
+            figure_reset = None
+            session_id = entry.get("session")
+        elif event == "game_resumed":
+            token = entry.get("token")
+        elif event == "game_ended":
+            return None
+        elif event == "state":
+            previous = snapshot
+            snapshot = GameSnapshot(*(entry[field] for field in GameSnapshot._fields))
+            if previous is not None and previous.current_turn != snapshot.current_turn:
+                turn_finished = False
+        elif event == "player_moved":
+            turn_finished = True
+        elif event == "robot_turn_started":
+            robot_turn = {"next": "throw", "old_position": entry["old_position"],
+                          "dice_value": None, "new_position": None, "interrupted": None}
+        elif event == "phase_started" and robot_turn is not None:
+            robot_turn["interrupted"] = entry["phase"]
+        elif event == "phase_done" and robot_turn is not None:
+            robot_turn.update(next=entry["next"], dice_value=entry["dice_value"],
+                              new_position=entry["new_position"], interrupted=None)
+        elif event == "figure_reset_started":
+            figure_reset = {"from_field": entry["from_field"], "player_field": entry["player_field"]}
+        elif event == "figure_reset_done":
+            figure_reset = None
+        elif event == "robot_turn_done":
+            robot_turn = None
+            turn_finished = True
+
+    if snapshot is None or snapshot.game_over:
+        return None
+    return ResumePoint(snapshot, session_id, token, turn_finished, robot_turn, figure_reset)
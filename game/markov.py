@@ -0,0 +1,108 @@
+from functools import lru_cache
+
+import numpy as np
+
+from game.board import BOARD
+from game.simulator import PLAYER, ROBOT, build_board_lookup
+
+
+def resolve_move(mover, mover_position, other_position, roll, lookup, max_field):
+    """Apply one roll with the GameState rules.
+
+    Returns (winner, mover_position, other_position); winner is None while the game goes on.
+    """
+    target = mover_position + roll
+    if target >= max_field:
+        return mover, max_field, other_position
+
+    if target == other_position:
+        other_position = 1
+
+    final = int(lookup[target])
+    if mover == PLAYER and final == other_position:
+        other_position = 1
+
+    return None, final, other_position
+
+
+class OddsTable:
+    """Exact win probability and expected remaining moves for every (player, robot, turn) state."""
+
+    def __init__(self, player_win, expected_moves, expected_robot_moves, max_field):
+        self.player_win = player_win
+        self.expected_moves = expected_moves
+        self.expected_robot_moves = expected_robot_moves
+        self.max_field = max_field
+
+    def lookup(self, player_position, robot_position, turn):
+        """Return the odds for a state; turn is "player" or "robot" like GameState.current_turn."""
+        t = PLAYER if turn == "player" else ROBOT
+        return {
+            "player_win_probability": float(self.player_win[t, player_position, robot_position]),
+            "expected_remaining_moves": float(self.expected_moves[t, player_position, robot_position]),
+            "expected_remaining_robot_turns": float(self.expected_robot_moves[t, player_position, robot_position]),
+        }
+
+    def for_snapshot(self, snapshot):
+        """Return the odds for a GameState snapshot."""
+        if snapshot.game_over:
+            won = snapshot.winner == "player"
+            return {
+                "player_win_probability": 1.0 if won else 0.0,
+                "expected_remaining_moves": 0.0,
+                "expected_remaining_robot_turns": 0.0,
+            }
+        return self.lookup(snapshot.player_position, snapshot.robot_position, snapshot.current_turn)
+
+
+def solve(board_map=None, max_field=BOARD.fields):
+    """Build the transition matrix of the two-player chain and solve it exactly."""
+    lookup = build_board_lookup(board_map, max_field)
+    fields = max_field - 1
+    n_states = 2 * fields * fields
+
+    def index(turn, player_position, robot_position):
+        return (turn * fields + player_position - 1) * fields + robot_position - 1
+
+    transitions = np.zeros((n_states, n_states))
+    immediate_player_win = np.zeros(n_states)
+    is_robot_turn = np.zeros(n_states)
+
+    for turn in (PLAYER, ROBOT):
+        for player_position in range(1, max_field):
+            for robot_position in range(1, max_field):
+                state = index(turn, player_position, robot_position)
+                is_robot_turn[state] = turn
+                for roll in range(1, 7):
+                    if turn == PLAYER:
+                        winner, p, r = resolve_move(PLAYER, player_position, robot_position, roll, lookup, max_field)
+                    else:
+                        winner, r, p = resolve_move(ROBOT, robot_position, player_position, roll, lookup, max_field)
+
+                    if winner is None:
+                        transitions[state, index(1 - turn, p, r)] += 1 / 6
+                    elif winner == PLAYER:
+                        immediate_player_win[state] += 1 / 6
+
+    # Absorbing chain: x = T x + b  =>  (I - T) x = b, solved once for all right-hand sides
+    rhs = np.stack([immediate_player_win, np.ones(n_states), is_robot_turn], axis=1)
+    solution = np.linalg.solve(np.eye(n_states) - transitions, rhs)
+
+    def to_table(column):
+        table = np.zeros((2, max_field + 1, max_field + 1), dtype=np.float32)
+        table[:, 1:max_field, 1:max_field] = column.reshape(2, fields, fields)
+        return table
+
+    return OddsTable(to_table(solution[:, 0]), to_table(solution[:, 1]), to_table(solution[:, 2]), max_field)
+
+
+@lru_cache(maxsize=8)
+def _cached_table(board_items, max_field):
+    return solve(dict(board_items), max_field)
+
+
+def get_odds_table(board_map=None, max_field=BOARD.fields):
+    """Return the solved odds table for a board, computing it only once per process."""
+    if board_map is None:
+        board_map = BOARD.board_map
+    return _cached_table(tuple(sorted(board_map.items())), max_field)
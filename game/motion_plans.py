@@ -0,0 +1,242 @@
+import hashlib
+import json
+import os
+import threading
+from typing import NamedTuple, Tuple
+
+from config import COLLISION_RESET, GAME_CONFIG, MOTION_PLAN_FILE
+from game.board import BOARD
+from robot.calibration import Pose
+
+ALTERNATIVE_YAW = 90
+
+# Bump when the step format changes so plans stored by older versions are rebuilt
+PLAN_FORMAT = 3
+
+# Rough cost of one robot API request: the call itself plus the client's fixed pause after it
+REQUEST_SECONDS = 1.2
+
+# Between the two hops of a ladder or snake move the arm goes to the default position and waits there
+INTERMEDIATE_SECONDS = REQUEST_SECONDS + 3
+
+
+class MotionStep(NamedTuple):
+    action: str              # "move", "grasp" or "release"
+    target: object           # Pose for "move", gripper value for "grasp" and "release"
+    settle: float            # seconds to wait after the request
+    message: str
+
+
+class MotionPlan(NamedTuple):
+    from_field: int
+    to_field: int
+    alternative_from: bool
+    alternative_to: bool
+    steps: Tuple[MotionStep, ...]
+    estimated_seconds: float
+
+
+def _pickup_steps(board, field, alternative):
+    up = board.field_pose(field, "up")
+    down = board.field_pose(field, "down")
+    grab = GAME_CONFIG["gripper_closed_figur"]
+    if not alternative:
+        return [
+            MotionStep("move", up, 3, f"  - Moving above field {field}..."),
+            MotionStep("move", down, 3, f"  - Lowering to field {field}..."),
+            MotionStep("grasp", grab, 1, "  - Closing gripper to grab character..."),
+            MotionStep("move", up, 1, f"  - Lifting character from field {field}..."),
+        ]
+    up_alt = up.with_yaw(ALTERNATIVE_YAW)
+    down_alt = down.with_yaw(ALTERNATIVE_YAW)
+    return [
+        MotionStep("move", up, 3, f"  - Moving above field {field}..."),
+        MotionStep("move", up_alt, 10, "  - Adjusting to alternative angle (yaw 90) for pickup..."),
+        MotionStep("move", down_alt, 3, f"  - Lowering to field {field} with alternative angle..."),
+        MotionStep("grasp", grab, 1, "  - Closing gripper to grab character..."),
+        MotionStep("move", up_alt, 1, f"  - Lifting character from field {field} with alternative angle..."),
+    ]
+
+
+def _place_steps(board, field, alternative):
+    up = board.field_pose(field, "up")
+    down = board.field_pose(field, "down")
+    release = GAME_CONFIG["gripper_open"]
+    if not alternative:
+        return [
+            MotionStep("move", up, 3, f"  - Moving above field {field}..."),
+            MotionStep("move", down, 3, f"  - Lowering to field {field}..."),
+            MotionStep("release", release, 1, "  - Opening gripper to release character..."),
+            MotionStep("move", up, 1, f"  - Lifting from field {field}..."),
+        ]
+    up_alt = up.with_yaw(ALTERNATIVE_YAW)
+    down_alt = down.with_yaw(ALTERNATIVE_YAW)
+    return [
+        MotionStep("move", up, 3, f"  - Moving above field {field}..."),
+        MotionStep("move", up_alt, 10, "  - Adjusting to alternative angle (yaw 90)..."),
+        MotionStep("move", down_alt, 3, f"  - Lowering to field {field} with alternative angle..."),
+        MotionStep("release", release, 1, "  - Opening gripper to release character..."),
+        MotionStep("move", up_alt, 1, f"  - Lifting from field {field} with alternative angle..."),
+    ]
+
+
+def estimate_seconds(steps):
+    return sum(REQUEST_SECONDS + step.settle for step in steps)
+
+
+def estimate_move(plans):
+    """Estimated seconds of a figure move made of these hops, including the stop between them."""
+    return sum(plan.estimated_seconds for plan in plans) + INTERMEDIATE_SECONDS * (len(plans) - 1)
+
+
+def build_plan(from_field, to_field, alternative_from, alternative_to, board=BOARD):
+    """Build the pick-and-place sequence for moving a figure between two fields."""
+    steps = tuple(_pickup_steps(board, from_field, alternative_from) + _place_steps(board, to_field, alternative_to))
+    return MotionPlan(from_field, to_field, alternative_from, alternative_to, steps, estimate_seconds(steps))
+
+
+def board_fingerprint(board=BOARD):
+    """Hash of everything a plan depends on, so stored plans are dropped when the board changes."""
+    data = json.dumps([PLAN_FORMAT, board.poses[1:], GAME_CONFIG["gripper_open"], GAME_CONFIG["gripper_closed_figur"],
+                       ALTERNATIVE_YAW, REQUEST_SECONDS], sort_keys=True)
+    return hashlib.sha1(data.encode()).hexdigest()[:16]
+
+
+class MotionPlanCache:
+    """Memoized motion plans keyed by (from_field, to_field, alternative_from, alternative_to).
+
+    The key covers everything that changes a plan: the player figure only matters
+    through whether it stands next to the source or target field. Plans are kept
+    in a JSON file between games and rebuilt only when the board changes.
+    """
+
+    def __init__(self, path=MOTION_PLAN_FILE, board=BOARD):
+        self.path = path
+        self.board = board
+        self.fingerprint = board_fingerprint(board)
+        self._plans = {}
+        self._dirty = False
+        self._lock = threading.Lock()
+        self._load()
+
+    def key(self, from_field, to_field, player_field=None):
+        alternative_from = bool(player_field) and self.board.is_horizontally_adjacent(from_field, player_field)
+        alternative_to = bool(player_field) and self.board.is_horizontally_adjacent(to_field, player_field)
+        return from_field, to_field, alternative_from, alternative_to
+
+    def get(self, from_field, to_field, player_field=None):
+        key = self.key(from_field, to_field, player_field)
+        with self._lock:
+            plan = self._plans.get(key)
+            if plan is None:
+                plan = self._plans[key] = build_plan(*key, board=self.board)
+                self._dirty = True
+        return plan
+
+    def move_plans(self, from_field, to_field, player_field=None):
+        """Plans of a figure move whose roll lands on to_field: one hop, or two on a ladder or snake."""
+        final = self.board.apply_rules(to_field)
+        plans = [self.get(from_field, to_field, player_field)]
+        if final != to_field:
+            plans.append(self.get(to_field, final, player_field))
+        return plans
+
+    def prebuild(self, robot_position, player_position, max_field=None):
+        """Build the plans for all six possible robot rolls, including a collision reset, and save new ones.
+
+        Returns {roll: estimated seconds} for the rolls that need the robot figure to
+        move; a winning roll has none since the game ends before the figure moves.
+        """
+        max_field = max_field or self.board.fields
+        estimates = {}
+        for roll in range(1, 7):
+            target = robot_position + roll
+            if target >= max_field:
+                continue
+            # Mirrors GameState.move_robot: landing on the player sends the player home,
+            # carried there by the arm around the robot's figure before the robot moves
+            player_field = player_position
+            reset_seconds = 0.0
+            if target == player_position:
+                player_field = 1
+                if COLLISION_RESET == "robot" and robot_position != 1:
+                    reset_seconds = self.get(player_position, 1, robot_position).estimated_seconds
+            estimates[roll] = reset_seconds + estimate_move(self.move_plans(robot_position, target, player_field))
+        self.save()
+        return estimates
+
+    def save(self):
+        with self._lock:
+            if not self._dirty or not self.path:
+                return
+            data = {
+                "board": self.fingerprint,
+                "plans": [
+                    {"key": list(key), "steps": [list(step) for step in plan.steps]}
+                    for key, plan in self._plans.items()
+                ],
+            }
+            self._dirty = False
+            # Stations with the same calibration share this cache, so their saves must not interleave
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            tmp_path = self.path + ".tmp"
+            with open(tmp_path, "w") as f:
+                json.dump(data, f)
+            os.replace(tmp_path, self.path)
+
+    def _load(self):
+        if not self.path or not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path) as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+        if data.get("board") != self.fingerprint:
+            return
+        for entry in data.get("plans", []):
+            key = tuple(entry["key"])
+            steps = tuple(_load_step(*step) for step in entry["steps"])
+            self._plans[key] = MotionPlan(*key, steps, estimate_seconds(steps))
+
+
+def _load_step(action, target, settle, message):
+    if action == "move":
+        target = Pose(*target)
+    return MotionStep(action, target, settle, message)
+
+
+def eta_range(estimates):
+    """Return (fastest, slowest) of the estimated seconds prebuild returned, or None if there are none."""
+    if not estimates:
+        return None
+    return min(estimates.values()), max(estimates.values())
+
+
+_caches = {}
+_cache_by_board = {}
+_cache_lock = threading.Lock()
+
+
+def get_plan_cache(board=BOARD):
+    """Return the process-wide plan cache of a board, loading it from disk on first use.
+
+    Boards calibrated differently from the configured one keep their plans in a file
+    named after their fingerprint, so stations do not overwrite each other's plans.
+    """
+    with _cache_lock:
+        entry = _cache_by_board.get(id(board))
+        if entry is not None and entry[0] is board:
+            return entry[1]
+        fingerprint = board_fingerprint(board)
+        cache = _caches.get(fingerprint)
+        if cache is None:
+            path = MOTION_PLAN_FILE
+            if path and fingerprint != board_fingerprint(BOARD):
+                root, ext = os.path.splitext(path)
+                path = f"{root}-{fingerprint}{ext}"
+            cache = _caches[fingerprint] = MotionPlanCache(path, board)
+        _cache_by_board[id(board)] = (board, cache)
+        return cache
@@ -0,0 +1,83 @@
+import threading
+
+import clock
+from config import GAME_CONFIG
+from game.game_logic import move_to_default_position, move_to_position
+from metrics import PREPOSITION_RUNS
+from robot.calibration import POSES
+
+# Seconds to let each preparatory motion finish, matching the waits in throw_dice
+SETTLE_SECONDS = {"open_gripper": 1, "dice_up": 3}
+
+
+class IdlePreparer:
+    """Runs the first, harmless steps of the next robot turn while the human plays.
+
+    The arm would otherwise wait at the default position until the player has
+    entered their dice. start() opens the gripper and moves above the dice in a
+    background thread; every wait between steps can be interrupted. The robot's
+    turn calls finish() to learn whether it can begin its throw from
+    dice_position_up. cancel() stops the sequence and brings the arm home, for
+    example before a collision prompt asks someone to reach over the board.
+    """
+
+    def __init__(self, client, token, poses=POSES):
+        self.client = client
+        self.token = token
+        self.poses = poses
+        self._cancel = threading.Event()
+        self._lock = threading.Lock()
+        self._thread = None
+        self._completed = False
+
+    def start(self):
+        """Begin preparing unless a preparation is already running or done."""
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._cancel.clear()
+            self._completed = False
+            self._thread = threading.Thread(target=self._run, daemon=True)
+            self._thread.start()
+
+    def finish(self):
+        """Wait for the running step and return True if the arm is above the dice with the gripper open."""
+        thread = self._take_thread()
+        if thread is None:
+            return False
+        thread.join()
+        return self._completed
+
+    def cancel(self, return_home=True):
+        """Stop preparing. The arm goes back to the default position if it had left it."""
+        thread = self._take_thread()
+        if thread is None:
+            return
+        self._cancel.set()
+        thread.join()
+        if return_home:
+            move_to_default_position(self.client, self.token, self.poses)
+        self._completed = False
+
+    def _take_thread(self):
+        with self._lock:
+            thread, self._thread = self._thread, None
+        return thread
+
+    def _steps(self):
+        yield "open_gripper", lambda: self.client.set_gripper_value(self.token, GAME_CONFIG["gripper_open"])
+        yield "dice_up", lambda: move_to_position(self.client, self.token, self.poses.dice_position_up)
+
+    def _run(self):
+        for name, step in self._steps():
+            if self._cancel.is_set():
+                PREPOSITION_RUNS.inc(outcome="cancelled")
+                return
+            if not step():
+                PREPOSITION_RUNS.inc(outcome="failed")
+                return
+            if clock.wait(self._cancel, SETTLE_SECONDS[name]):
+                PREPOSITION_RUNS.inc(outcome="cancelled")
+                return
+        self._completed = True
+        PREPOSITION_RUNS.inc(outcome="completed")
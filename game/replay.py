@@ -0,0 +1,137 @@
+import argparse
+import contextlib
+import io
+import time
+
+import numpy as np
+
+import clock
+import profiling
+from clock import VirtualClock
+from game.game_logic import TurnPorts, fixed_dice_fallback, reset_figure, robot_turn
+from game.game_state import GameState
+from robot.movement import initialize
+from robot.simulated import SimulatedRobotClient
+from vision.simulated import SimulatedCamera
+
+
+def quiet_log(message, category='robot'):
+    pass
+
+
+def play_game(client, camera_url, rng, player_turn_seconds=20.0, ports=None, on_robot_turn=None):
+    """Play one complete game against a simulated station with the real turn engine.
+
+    The player's rolls come from rng and each player turn takes player_turn_seconds.
+    Returns the winner, the number of moves and robot turns and the game's duration
+    on the process clock; winner is None if a robot turn failed. After every robot
+    turn on_robot_turn, if given, gets the turn's trace and the real seconds the
+    turn took to compute.
+    """
+    ports = ports or TurnPorts(log=quiet_log, confirm=lambda message: None, dice_fallback=fixed_dice_fallback(3))
+    token = client.register_operator("snake.exe", "snake@mail.com")
+    initialize(client, token)
+    game_state = GameState()
+    started = clock.now()
+    moves = 0
+    robot_turns = 0
+
+    while not game_state.is_game_over():
+        if game_state.get_current_turn() == "player":
+            clock.sleep(player_turn_seconds)
+            dice_value = int(rng.integers(1, 7))
+            target_field = game_state.get_player_position() + dice_value
+            if target_field == game_state.get_robot_position() and target_field < game_state.max_field:
+                reset_figure(client, token, "robot", target_field, game_state.get_player_position(), ports.log,
+                             ports.confirm, game_state.board)
+                game_state.reset_robot_position()
+            robot_before_move = game_state.get_robot_position()
+            player_before_move = game_state.get_player_position()
+            game_state.move_player(dice_value)
+            if game_state.get_robot_position() != robot_before_move:
+                reset_figure(client, token, "robot", robot_before_move, player_before_move, ports.log,
+                             ports.confirm, game_state.board)
+        else:
+            robot_turns += 1
+            started_compute = time.perf_counter()
+            completed = robot_turn(client, token, game_state, ports, camera_url=camera_url)
+            if on_robot_turn is not None:
+                on_robot_turn(profiling.last_trace(), time.perf_counter() - started_compute)
+            if not completed:
+                break
+        moves += 1
+        if not game_state.is_game_over():
+            game_state.switch_turn()
+
+    client.delete_operator(token)
+    return {
+        "winner": game_state.get_winner(),
+        "moves": moves,
+        "robot_turns": robot_turns,
+        "seconds": clock.now() - started,
+    }
+
+
+def replay_games(n_games, seed=None, grasp_miss_rate=0.0, player_turn_seconds=20.0, camera=None,
+                 on_robot_turn=None):
+    """Play n_games complete games on a simulated robot and camera under a virtual clock.
+
+    camera defaults to a SimulatedCamera rendering the dice; pass a RecordedCamera
+    to detect on frames from the real stream instead.
+    """
+    rng = np.random.default_rng(seed)
+    if camera is None:
+        camera = SimulatedCamera(url="sim://replay-camera", rng=rng)
+    camera.install()
+    client = SimulatedRobotClient(grasp_miss_rate=grasp_miss_rate, on_throw=camera.show, rng=rng)
+
+    previous_clock = clock.set_clock(VirtualClock())
+    profiling.set_profile_dir(None)
+    try:
+        return [play_game(client, camera.url, rng, player_turn_seconds, on_robot_turn=on_robot_turn)
+                for _ in range(n_games)]
+    finally:
+        clock.set_clock(previous_clock)
+
+
+def summarize(results):
+    finished = [r for r in results if r["winner"] is not None]
+    seconds = np.array([r["seconds"] for r in finished])
+    return {
+        "games": len(results),
+        "failed": len(results) - len(finished),
+        "player_win_rate": sum(r["winner"] == "player" for r in finished) / max(len(finished), 1),
+        "moves_mean": float(np.mean([r["moves"] for r in finished])) if finished else None,
+        "game_seconds_mean": float(seconds.mean()) if finished else None,
+        "game_seconds_percentiles": {
+            str(p): float(np.percentile(seconds, p)) for p in (50, 90, 99)
+        } if finished else {},
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay complete games on a simulated robot and camera")
+    parser.add_argument("--games", type=int, default=1000)
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--grasp-miss-rate", type=float, default=0.0)
+    parser.add_argument("--player-turn-seconds", type=float, default=20.0)
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    # The detector and robot helpers print progress for every turn
+    with contextlib.redirect_stdout(io.StringIO()):
+        results = replay_games(args.games, args.seed, args.grasp_miss_rate, args.player_turn_seconds)
+    elapsed = time.perf_counter() - started
+    summary = summarize(results)
+
+    print(f"Replayed {summary['games']} games in {elapsed:.2f}s")
+    if summary["moves_mean"] is not None:
+        print(f"Player win rate: {summary['player_win_rate']:.2%}, moves per game: mean {summary['moves_mean']:.1f}")
+        print(f"Game length on the robot: mean {summary['game_seconds_mean'] / 60:.1f} min, "
+              + ", ".join(f"p{p} {v / 60:.1f} min" for p, v in summary["game_seconds_percentiles"].items()))
+    if summary["failed"]:
+        print(f"Warning: {summary['failed']} games ended with a failed robot turn")
+
+
+if __name__ == "__main__":
+    main()
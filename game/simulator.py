@@ -0,0 +1,145 @@
+import argparse
+import time
+
+import numpy as np
+
+from game.board import BOARD
+
+PLAYER = 0
+ROBOT = 1
+
+
+def build_board_lookup(board_map=None, max_field=BOARD.fields):
+    """Return an array where lookup[field] is the field after applying ladders and snakes."""
+    if board_map is None and max_field == BOARD.fields:
+        return BOARD.jump
+    if board_map is None:
+        board_map = BOARD.board_map
+    lookup = np.arange(max_field + 1, dtype=np.int16)
+    for start, end in board_map.items():
+        lookup[start] = end
+    return lookup
+
+
+def simulate_games(n_games, board_map=None, max_field=BOARD.fields, seed=None, max_moves=1000, batch_size=1_000_000):
+    """Play n_games complete games in parallel and return per-game winner and move counts.
+
+    Applies the same rules as GameState: the player moves first, reaching or passing
+    max_field wins and landing on the opponent sends it back to field 1. Like
+    GameState.move_player, a ladder or snake that ends on the robot also sends the
+    robot back; move_robot has no such check.
+    """
+    rng = np.random.default_rng(seed)
+    lookup = build_board_lookup(board_map, max_field)
+
+    winners = np.empty(n_games, dtype=np.int8)
+    moves = np.empty(n_games, dtype=np.int32)
+
+    for start in range(0, n_games, batch_size):
+        count = min(batch_size, n_games - start)
+        batch_winners, batch_moves = _simulate_batch(count, lookup, max_field, rng, max_moves)
+        winners[start:start + count] = batch_winners
+        moves[start:start + count] = batch_moves
+
+    return {"winner": winners, "moves": moves, "max_field": max_field}
+
+
+def _simulate_batch(n_games, lookup, max_field, rng, max_moves):
+    # positions[0] is the player, positions[1] the robot
+    positions = np.ones((2, n_games), dtype=np.int16)
+    winners = np.full(n_games, -1, dtype=np.int8)
+    moves = np.zeros(n_games, dtype=np.int32)
+    active = np.arange(n_games)
+
+    for move in range(max_moves):
+        if active.size == 0:
+            break
+
+        mover = move % 2
+        other = 1 - mover
+
+        rolls = rng.integers(1, 7, size=active.size, dtype=np.int16)
+        targets = positions[mover, active] + rolls
+        moves[active] = move + 1
+
+        won = targets >= max_field
+        winners[active[won]] = mover
+        positions[mover, active[won]] = max_field
+
+        still = ~won
+        idx = active[still]
+        targets = targets[still]
+
+        opponent = positions[other, idx]
+        opponent[targets == opponent] = 1
+
+        final = lookup[targets]
+        if mover == PLAYER:
+            opponent[final == opponent] = 1
+
+        positions[mover, idx] = final
+        positions[other, idx] = opponent
+        active = idx
+
+    return winners, moves
+
+
+def summarize(result, player_turn_seconds=None, robot_turn_seconds=None):
+    """Summarize a simulate_games result into game-length and win-rate statistics."""
+    winners = result["winner"]
+    moves = result["moves"]
+    finished = winners >= 0
+    finished_moves = moves[finished]
+
+    summary = {
+        "games": int(winners.size),
+        "unfinished": int((~finished).sum()),
+        "player_win_rate": float((winners == PLAYER).sum() / max(finished.sum(), 1)),
+        "moves_mean": float(finished_moves.mean()) if finished_moves.size else None,
+        "moves_percentiles": {
+            str(p): int(np.percentile(finished_moves, p)) for p in (50, 90, 99)
+        } if finished_moves.size else {},
+        "moves_histogram": np.bincount(finished_moves).tolist() if finished_moves.size else [],
+    }
+    summary["first_mover_advantage"] = summary["player_win_rate"] - 0.5
+
+    if player_turn_seconds is not None and robot_turn_seconds is not None and finished_moves.size:
+        # The player moves on odd move numbers, the robot on even ones
+        player_moves = (finished_moves + 1) // 2
+        robot_moves = finished_moves // 2
+        durations = player_moves * player_turn_seconds + robot_moves * robot_turn_seconds
+        summary["session_seconds_mean"] = float(durations.mean())
+        summary["session_seconds_percentiles"] = {
+            str(p): float(np.percentile(durations, p)) for p in (50, 90, 99)
+        }
+
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Monte Carlo simulation of the Snakes and Ladders board")
+    parser.add_argument("--games", type=int, default=1_000_000)
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--player-turn-seconds", type=float, default=None)
+    parser.add_argument("--robot-turn-seconds", type=float, default=None)
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    result = simulate_games(args.games, seed=args.seed)
+    elapsed = time.perf_counter() - started
+    summary = summarize(result, args.player_turn_seconds, args.robot_turn_seconds)
+
+    print(f"Simulated {summary['games']} games in {elapsed:.2f}s")
+    print(f"Player (first mover) win rate: {summary['player_win_rate']:.2%} "
+          f"(advantage {summary['first_mover_advantage']:+.2%})")
+    print(f"Moves per game: mean {summary['moves_mean']:.1f}, "
+          + ", ".join(f"p{p} {v}" for p, v in summary["moves_percentiles"].items()))
+    if "session_seconds_mean" in summary:
+        print(f"Session length: mean {summary['session_seconds_mean'] / 60:.1f} min, "
+              + ", ".join(f"p{p} {v / 60:.1f} min" for p, v in summary["session_seconds_percentiles"].items()))
+    if summary["unfinished"]:
+        print(f"Warning: {summary['unfinished']} games did not finish")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,206 @@
+import threading
+from contextlib import contextmanager
+
+import clock
+
+
+def _format_labels(labels):
+    if not labels:
+        return ""
+    parts = []
+    for key, value in labels:
+        escaped = str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+        parts.append(f'{key}="{escaped}"')
+    return "{" + ",".join(parts) + "}"
+
+
+def _format_value(value):
+    if value == float("inf"):
+        return "+Inf"
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return repr(value) if isinstance(value, float) else str(value)
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name, help_text):
+        self.name = name
+        self.help_text = help_text
+        self._lock = threading.Lock()
+
+    def header(self):
+        return [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} {self.kind}"]
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name, help_text):
+        super().__init__(name, help_text)
+        self._values = {}
+
+    def inc(self, amount=1, **labels):
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def render(self):
+        with self._lock:
+            items = list(self._values.items())
+        return [f"{self.name}{_format_labels(key)} {_format_value(value)}" for key, value in items]
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def __init__(self, name, help_text, function=None):
+        super().__init__(name, help_text)
+        self._values = {}
+        self._function = function
+
+    def set(self, value, **labels):
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            self._values[key] = value
+
+    def set_function(self, function):
+        """Compute the value at scrape time instead of storing it."""
+        self._function = function
+
+    def render(self):
+        if self._function is not None:
+            value = self._function()
+            return [] if value is None else [f"{self.name} {_format_value(value)}"]
+        with self._lock:
+            items = list(self._values.items())
+        return [f"{self.name}{_format_labels(key)} {_format_value(value)}" for key, value in items]
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    DEFAULT_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120)
+
+    def __init__(self, name, help_text, buckets=DEFAULT_BUCKETS):
+        super().__init__(name, help_text)
+        self.buckets = tuple(buckets) + (float("inf"),)
+        self._series = {}
+
+    def observe(self, value, **labels):
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [[0] * len(self.buckets), 0.0, 0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[0][i] += 1
+            series[1] += value
+            series[2] += 1
+
+    @contextmanager
+    def time(self, **labels):
+        started = clock.now()
+        try:
+            yield
+        finally:
+            self.observe(clock.now() - started, **labels)
+
+    def render(self):
+        with self._lock:
+            items = [(key, list(counts), total, count) for key, (counts, total, count) in self._series.items()]
+        lines = []
+        for key, counts, total, count in items:
+            for bound, bucket_count in zip(self.buckets, counts):
+                labels = key + (("le", _format_value(float(bound))),)
+                lines.append(f"{self.name}_bucket{_format_labels(labels)} {bucket_count}")
+            lines.append(f"{self.name}_sum{_format_labels(key)} {_format_value(total)}")
+            lines.append(f"{self.name}_count{_format_labels(key)} {count}")
+        return lines
+
+
+class Registry:
+
+    def __init__(self):
+        self._metrics = []
+        self._lock = threading.Lock()
+
+    def register(self, metric):
+        with self._lock:
+            self._metrics.append(metric)
+        return metric
+
+    def counter(self, name, help_text):
+        return self.register(Counter(name, help_text))
+
+    def gauge(self, name, help_text, function=None):
+        return self.register(Gauge(name, help_text, function))
+
+    def histogram(self, name, help_text, buckets=Histogram.DEFAULT_BUCKETS):
+        return self.register(Histogram(name, help_text, buckets))
+
+    def render(self):
+        with self._lock:
+            metrics = list(self._metrics)
+        lines = []
+        for metric in metrics:
+            lines.extend(metric.header())
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+TURN_SECONDS = REGISTRY.histogram(
+    "snake_robot_turn_seconds", "Duration of a complete robot turn.")
+TURN_PHASE_SECONDS = REGISTRY.histogram(
+    "snake_robot_turn_phase_seconds", "Duration of each robot turn engine state (throw, settle, detect, fallback, resolve, reset_player, move_figure, fetch_dice, home).")
+ROBOT_API_SECONDS = REGISTRY.histogram(
+    "snake_robot_api_request_seconds", "Latency of robot API requests per endpoint.",
+    buckets=(0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10))
+ROBOT_API_ERRORS = REGISTRY.counter(
+    "snake_robot_api_errors_total", "Robot API requests that failed or returned an unexpected status.")
+DICE_CONFIDENCE = REGISTRY.histogram(
+    "snake_dice_detection_confidence", "Share of frames agreeing with the detected dice value.",
+    buckets=(0.2, 0.4, 0.6, 0.8, 0.9, 1.0))
+DICE_FRAMES_USED = REGISTRY.histogram(
+    "snake_dice_detection_frames", "Frames read for one dice detection.",
+    buckets=(1, 2, 3, 4, 5, 10, 20))
+DICE_DETECTION_FAILURES = REGISTRY.counter(
+    "snake_dice_detection_failures_total", "Dice detections that produced no value.")
+WS_CLIENTS = REGISTRY.gauge(
+    "snake_websocket_clients", "Connected websocket clients.")
+WS_QUEUE_DEPTH = REGISTRY.gauge(
+    "snake_websocket_send_queue_depth", "Messages waiting in the fullest websocket client queue.")
+GRASP_RESULTS = REGISTRY.counter(
+    "snake_gripper_grasps_total", "Gripper grasps by verified outcome (held, empty, not_moved, no_feedback).")
+PREPOSITION_RUNS = REGISTRY.counter(
+    "snake_robot_prepositioning_total", "Idle-time preparations of the next robot turn by outcome.")
+SESSIONS_QUEUED = REGISTRY.gauge(
+    "snake_sessions_queued", "Web games waiting for a free robot station.")
+STATIONS_BUSY = REGISTRY.gauge(
+    "snake_stations_busy", "Robot stations currently playing a game.")
+GAMES_COMPLETED = REGISTRY.counter(
+    "snake_games_completed_total", "Games played to the end.")
+
+_game_finish_times = []
+_game_finish_lock = threading.Lock()
+
+
+def record_game_completed():
+    GAMES_COMPLETED.inc()
+    with _game_finish_lock:
+        _game_finish_times.append(clock.wall_time())
+
+
+def _games_last_hour():
+    cutoff = clock.wall_time() - 3600
+    with _game_finish_lock:
+        _game_finish_times[:] = [t for t in _game_finish_times if t >= cutoff]
+        return len(_game_finish_times)
+
+
+GAMES_PER_HOUR = REGISTRY.gauge(
+    "snake_games_per_hour", "Games completed in the last hour.", function=_games_last_hour)
@@ -0,0 +1,185 @@
+import json
+import os
+import threading
+from contextlib import contextmanager
+
+import clock
+from config import PROFILE_DIR
+from metrics import TURN_PHASE_SECONDS
+
+# Span categories that never contain each other, so their totals add up to a turn's time
+LEAF_CATEGORIES = ("network", "sleep", "vision")
+
+_local = threading.local()
+# Per-span totals and the last trace, kept per scope (a web game session; None for the CLI)
+_summaries = {}
+_summary_lock = threading.Lock()
+_last_traces = {}
+_turn_counter = 0
+_profile_dir = PROFILE_DIR
+
+
+class TurnProfile:
+    """Wall-clock spans recorded during one robot turn."""
+
+    def __init__(self, label, scope=None):
+        self.label = label
+        self.scope = scope
+        self.started = clock.now()
+        self.wall_started = clock.wall_time()
+        self.spans = []
+
+    def add(self, name, category, start, end, args=None):
+        self.spans.append((name, category, start, end, args))
+
+    def to_chrome_trace(self):
+        """Return the spans in the Chrome trace event format, loadable in Perfetto or chrome://tracing."""
+        events = [{
+            "name": "process_name", "ph": "M", "pid": 1, "tid": 1,
+            "args": {"name": f"robot turn {self.label}"},
+        }]
+        for name, category, start, end, args in self.spans:
+            event = {
+                "name": name,
+                "cat": category,
+                "ph": "X",
+                "ts": round((start - self.started) * 1e6),
+                "dur": round((end - start) * 1e6),
+                "pid": 1,
+                "tid": 1,
+            }
+            if args:
+                event["args"] = args
+            events.append(event)
+        return {"traceEvents": events, "displayTimeUnit": "ms",
+                "otherData": {"turn": self.label, "started_at": self.wall_started}}
+
+
+def current():
+    return getattr(_local, "profile", None)
+
+
+def current_scope():
+    return getattr(_local, "scope", None)
+
+
+@contextmanager
+def scope(key):
+    """Keep the turns profiled by this thread apart from other games', e.g. under a session id."""
+    previous = current_scope()
+    _local.scope = key
+    try:
+        yield
+    finally:
+        _local.scope = previous
+
+
+def forget(key):
+    """Drop the summary and last trace of a scope that is no longer needed."""
+    with _summary_lock:
+        _summaries.pop(key, None)
+        _last_traces.pop(key, None)
+
+
+def start_turn(label=None):
+    global _turn_counter
+    with _summary_lock:
+        _turn_counter += 1
+        number = _turn_counter
+    profile = TurnProfile(label if label is not None else number, current_scope())
+    _local.profile = profile
+    return profile
+
+
+def finish_turn():
+    """Stop recording, fold the spans into its scope's summary and write the trace file."""
+    profile = current()
+    if profile is None:
+        return None
+    _local.profile = None
+
+    trace = profile.to_chrome_trace()
+    with _summary_lock:
+        summary = _summaries.setdefault(profile.scope, {})
+        for name, category, start, end, _ in profile.spans:
+            duration = end - start
+            entry = summary.setdefault((category, name), [0, 0.0, 0.0])
+            entry[0] += 1
+            entry[1] += duration
+            entry[2] = max(entry[2], duration)
+        _last_traces[profile.scope] = trace
+
+    if _profile_dir:
+        os.makedirs(_profile_dir, exist_ok=True)
+        prefix = "turn" if profile.scope is None else f"turn-{profile.scope}"
+        path = os.path.join(_profile_dir, f"{prefix}-{int(profile.wall_started)}-{profile.label}.json")
+        with open(path, "w") as f:
+            json.dump(trace, f)
+    return trace
+
+
+def set_profile_dir(path):
+    """Write turn traces to path instead of PROFILE_DIR; None keeps them in memory only."""
+    global _profile_dir
+    _profile_dir = path
+
+
+def last_trace(key=None):
+    """Return the trace of the last turn profiled in a scope, by default the calling thread's."""
+    with _summary_lock:
+        return _last_traces.get(key if key is not None else current_scope())
+
+
+@contextmanager
+def span(name, category, **args):
+    profile = current()
+    if profile is None:
+        yield
+        return
+    started = clock.now()
+    try:
+        yield
+    finally:
+        profile.add(name, category, started, clock.now(), args or None)
+
+
+@contextmanager
+def phase(name):
+    """Time a robot turn phase for both the metrics endpoint and the turn timeline."""
+    with TURN_PHASE_SECONDS.time(phase=name), span(name, "phase"):
+        yield
+
+
+def sleep(seconds):
+    with span("sleep", "sleep", seconds=seconds):
+        clock.sleep(seconds)
+
+
+def session_summary(key=None):
+    """Return per-span totals across a scope's turns, largest total first; by default the calling thread's."""
+    with _summary_lock:
+        summary = _summaries.get(key if key is not None else current_scope(), {})
+        rows = [
+            {"category": category, "name": name, "count": count,
+             "total_seconds": round(total, 3), "max_seconds": round(longest, 3)}
+            for (category, name), (count, total, longest) in summary.items()
+        ]
+    rows.sort(key=lambda row: row["total_seconds"], reverse=True)
+    return rows
+
+
+def format_summary(key=None):
+    rows = session_summary(key)
+    if not rows:
+        return "No turns profiled yet."
+    by_category = {}
+    for row in rows:
+        if row["category"] in LEAF_CATEGORIES:
+            by_category[row["category"]] = by_category.get(row["category"], 0) + row["total_seconds"]
+    lines = ["Turn profile (session totals):"]
+    for row in rows:
+        if row["category"] == "phase":
+            lines.append(f"  phase {row['name']}: {row['total_seconds']:.1f}s over {row['count']} turns")
+    for category, total in sorted(by_category.items(), key=lambda item: -item[1]):
+        lines.append(f"  {category}: {total:.1f}s")
+    return "\n".join(lines)
@@ -1,7 +1,10 @@
 import requests
-import time
 from typing import Dict, List, Optional, Tuple
 
+import clock
+import profiling
+from metrics import ROBOT_API_ERRORS, ROBOT_API_SECONDS
+
 
 class XArmAPIClient:
     
@@ -14,12 +17,28 @@ class XArmAPIClient:
             'accept': 'application/json'
         })
 
+    # Sends a request and records its latency per endpoint
+    def _request(self, method: str, endpoint: str, url: str, **kwargs) -> requests.Response:
+        name = f"{method} {endpoint}"
+        started = clock.now()
+        try:
+            with profiling.span(name, "network"):
+                response = self.session.request(method, url, **kwargs)
+        except requests.RequestException:
+            ROBOT_API_ERRORS.inc(endpoint=name)
+            raise
+        finally:
+            ROBOT_API_SECONDS.observe(clock.now() - started, endpoint=name)
+        if response.status_code >= 400:
+            ROBOT_API_ERRORS.inc(endpoint=name)
+        return response
+
     # Retrieves the current operator
     def get_operator_info(self) -> Optional[Tuple[str, str, str]]:
         url = f"{self.base_url}/operator"
         try:
-            response = self.session.get(url)
-            time.sleep(1)
+            response = self._request("GET", "/operator", url)
+            profiling.sleep(1)
             
             if response.status_code == 200:
                 data = response.json()
@@ -31,7 +50,7 @@ class XArmAPIClient:
                 return None
         except requests.RequestException as e:
             print(f"Failed to get operator info: {e}")
-            time.sleep(1)
+            profiling.sleep(1)
             return None
 
     # Register as an operator to gain access to the robot
@@ -46,11 +65,12 @@ class XArmAPIClient:
                 "name": name,
                 "email": email
             }
-            response = self.session.post(url, json=data, headers=headers)
-            time.sleep(1)
+            response = self._request("POST", "/operator", url, json=data, headers=headers)
+            profiling.sleep(1)
             if response.status_code == 200:
                 location = response.headers['Location']
-                token = location.replace("https://api.interactions.ics.unisg.ch/cherrybot/operator/", "")
+                # The token is the last path segment, whichever station's base URL Location is on
+                token = location.rstrip("/").rsplit("/", 1)[-1]
                 return token
             elif response.status_code == 400:
                 return None
@@ -61,15 +81,15 @@ class XArmAPIClient:
                 return None
         except requests.RequestException as e:
             print(f"Failed to register operator: {e}")
-            time.sleep(1)
+            profiling.sleep(1)
             return None
         
     # Delete the current Operator
     def delete_operator(self, token: str) -> bool:
         url = f"{self.base_url}/operator/{token}"
         try:
-            response = self.session.delete(url)
-            time.sleep(1)
+            response = self._request("DELETE", "/operator", url)
+            profiling.sleep(1)
             if response.status_code == 200:
                 return True
             elif response.status_code == 404:
@@ -79,7 +99,7 @@ class XArmAPIClient:
                 return False
         except requests.RequestException as e:
             print(f"Failed to delete operator: {e}")
-            time.sleep(1)
+            profiling.sleep(1)
             return False
 
     # Resets the Robot by moving it back to its original state and position
@@ -90,8 +110,8 @@ class XArmAPIClient:
             'Authentication': token
         }
         try:
-            response = self.session.put(url, headers=headers)
-            time.sleep(1)
+            response = self._request("PUT", "/initialize", url, headers=headers)
+            profiling.sleep(1)
             if response.status_code == 200:
                 return True
             else:
@@ -99,7 +119,7 @@ class XArmAPIClient:
                 return False
         except requests.RequestException as e:
             print(f"Failed to initialize robot: {e}")
-            time.sleep(1)
+            profiling.sleep(1)
             return False
     
     # Retrieves the robots current coordinates and rotation of the robot
@@ -110,8 +130,8 @@ class XArmAPIClient:
             'Authentication': token
         }
         try:
-            response = self.session.get(url, headers=headers)
-            time.sleep(1)
+            response = self._request("GET", "/tcp", url, headers=headers)
+            profiling.sleep(1)
             if response.status_code == 200:
                 data = response.json()
                 coord = data['coordinate']
@@ -128,7 +148,7 @@ class XArmAPIClient:
                 return None
         except requests.RequestException as e:
             print(f"Failed to get TCP state: {e}")
-            time.sleep(1)
+            profiling.sleep(1)
             return None
 
     # Retrieves the Cherrybots target
@@ -139,8 +159,8 @@ class XArmAPIClient:
             'Authentication': token
         }
         try:
-            response = self.session.get(url, headers=headers)
-            time.sleep(1)
+            response = self._request("GET", "/tcp/target", url, headers=headers)
+            profiling.sleep(1)
             if response.status_code == 200:
                 data = response.json()
                 coord = data['coordinate']
@@ -157,7 +177,7 @@ class XArmAPIClient:
                 return None
         except requests.RequestException as e:
             print(f"Failed to get target: {e}")
-            time.sleep(1)
+            profiling.sleep(1)
             return None
 
     # Sets the Cherrybots tcp target, which it will move to
@@ -175,8 +195,8 @@ class XArmAPIClient:
             'speed': speed
         }
         try:
-            response = self.session.put(url, headers=headers, json=data)
-            time.sleep(1)
+            response = self._request("PUT", "/tcp/target", url, headers=headers, json=data)
+            profiling.sleep(1)
             if response.status_code == 200:
                 return True
             else:
@@ -184,7 +204,7 @@ class XArmAPIClient:
                 return False
         except requests.RequestException as e:
             print(f"Failed to set TCP target: {e}")
-            time.sleep(1)
+            profiling.sleep(1)
             return False
 
     # Changes the robot's gripper opening value
@@ -196,8 +216,8 @@ class XArmAPIClient:
             'Content-Type': 'application/json'
         }
         try:
-            response = self.session.put(url, headers=headers, json=value)
-            time.sleep(1)
+            response = self._request("PUT", "/gripper", url, headers=headers, json=value)
+            profiling.sleep(1)
             if response.status_code == 200:
                 return True
             else:
@@ -205,19 +225,19 @@ class XArmAPIClient:
                 return False
         except requests.RequestException as e:
             print(f"Failed to set gripper value: {e}")
-            time.sleep(1)
+            profiling.sleep(1)
             return False
 
-    # Retrieves the current gripper opening value
-    def get_gripper_value(self, token: str) -> Optional[int]:
+    # Retrieves the current gripper opening value; pause=0 skips the wait afterwards for polling
+    def get_gripper_value(self, token: str, pause: float = 1) -> Optional[int]:
         url = f"{self.base_url}/gripper"
         headers = {
             'accept': 'application/json',
             'Authentication': token
         }
         try:
-            response = self.session.get(url, headers=headers)
-            time.sleep(1)
+            response = self._request("GET", "/gripper", url, headers=headers)
+            profiling.sleep(pause)
             if response.status_code == 200:
                 data = response.json()
                 return data['value']
@@ -226,7 +246,7 @@ class XArmAPIClient:
                 return None
         except requests.RequestException as e:
             print(f"Failed to get gripper value: {e}")
-            time.sleep(1)
+            profiling.sleep(pause)
             return None
 
         
\ No newline at end of file
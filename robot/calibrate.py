@@ -0,0 +1,129 @@
+import argparse
+import shutil
+
+import numpy as np
+
+from config import CALIBRATION_FILE, CALIBRATION_MAX_RESIDUAL, CALIBRATION_REFERENCE_FIELDS
+from game.board import Board
+from robot.api_client import XArmAPIClient
+from robot.calibration import (CalibrationError, apply_transform, fit_affine, fit_homography, load_calibration,
+                               save_calibration)
+from robot.movement import initialize
+
+
+def fit_board(board, measurements, model="affine"):
+    """Fit the board -> robot transform from {field: (x, y)} and return the (x, y) of every field.
+
+    Returns (positions, residuals) with the fit error at each reference field in mm.
+    """
+    fields = sorted(measurements)
+    board_points = [board.position_of(field) for field in fields]
+    robot_points = [measurements[field] for field in fields]
+    fit = fit_homography if model == "homography" else fit_affine
+    matrix = fit(board_points, robot_points)
+
+    residuals = np.linalg.norm(apply_transform(matrix, board_points) - np.asarray(robot_points, dtype=float), axis=1)
+    all_points = [board.position_of(field) for field in range(1, board.fields + 1)]
+    positions = [(int(round(x)), int(round(y))) for x, y in apply_transform(matrix, all_points)]
+    return positions, dict(zip(fields, residuals))
+
+
+def recalibrated(calibration, positions):
+    """Return calibration with explicit field positions; Board validates them against the workspace."""
+    board = dict(calibration.board, field_positions=positions)
+    result = calibration._replace(board=board)
+    Board.from_calibration(result)
+    return result
+
+
+def measure_field(client, token, board, field):
+    """Lower the arm over a field and let the operator nudge it onto the field's center."""
+    pose = board.field_pose(field, "down")
+    client.set_tcp_target(token, *board.field_pose(field, "up"))
+    client.set_tcp_target(token, *pose)
+    print(f"\nField {field}: the gripper is lowered over its calibrated position.")
+    while True:
+        answer = input("  Nudge by 'dx dy' in mm, or press ENTER when centered: ").strip()
+        if not answer:
+            break
+        try:
+            dx, dy = (float(value) for value in answer.split())
+        except ValueError:
+            print("  Enter two numbers, e.g. '2 -1.5'.")
+            continue
+        pose = pose._replace(x=pose.x + dx, y=pose.y + dy)
+        client.set_tcp_target(token, *pose)
+
+    state = client.get_tcp_state(token)
+    client.set_tcp_target(token, *pose._replace(z=board.field_pose(field, "up").z))
+    if state is None:
+        raise CalibrationError(f"Could not read the arm's position at field {field}")
+    x, y = state[:2]
+    print(f"  Measured field {field} at x={x:.1f}, y={y:.1f}")
+    return x, y
+
+
+def parse_points(points):
+    """Parse 'field=x,y' arguments into {field: (x, y)}."""
+    measurements = {}
+    for point in points:
+        field, _, coordinates = point.partition("=")
+        x, y = coordinates.split(",")
+        measurements[int(field)] = (float(x), float(y))
+    return measurements
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Recalibrate every field pose from a few measured reference fields")
+    parser.add_argument("--calibration", default=CALIBRATION_FILE)
+    parser.add_argument("--fields", type=int, nargs="+", default=CALIBRATION_REFERENCE_FIELDS,
+                        help="Reference fields to measure, at least 3 not on one line")
+    parser.add_argument("--model", choices=["affine", "homography"], default="affine")
+    parser.add_argument("--points", nargs="+", metavar="FIELD=X,Y",
+                        help="Use these measured positions instead of measuring with the arm")
+    parser.add_argument("--dry-run", action="store_true", help="Show the result without writing the file")
+    args = parser.parse_args()
+
+    calibration = load_calibration(args.calibration)
+    board = Board.from_calibration(calibration)
+
+    if args.points:
+        measurements = parse_points(args.points)
+    else:
+        client = XArmAPIClient()
+        token = client.register_operator("snake.exe", "snake@mail.com")
+        if token is None:
+            print("Failed to register operator. Is another operator still registered?")
+            return
+        try:
+            initialize(client, token, calibration.poses)
+            measurements = {field: measure_field(client, token, board, field) for field in args.fields}
+        finally:
+            client.delete_operator(token)
+
+    try:
+        positions, residuals = fit_board(board, measurements, args.model)
+        result = recalibrated(calibration, positions)
+    except CalibrationError as e:
+        print(f"Calibration failed: {e}")
+        return
+
+    print("\nFit error at the reference fields:")
+    for field, residual in residuals.items():
+        print(f"  field {field}: {residual:.2f} mm")
+    shifts = [np.hypot(x - old.x, y - old.y)
+              for (x, y), old in zip(positions, (board.field_pose(f, "down") for f in range(1, board.fields + 1)))]
+    print(f"Field positions moved by up to {max(shifts):.1f} mm (mean {np.mean(shifts):.1f} mm)")
+
+    if max(residuals.values()) > CALIBRATION_MAX_RESIDUAL:
+        print(f"Fit error above {CALIBRATION_MAX_RESIDUAL} mm, not saving. Re-measure the reference fields.")
+        return
+    if args.dry_run:
+        return
+    shutil.copyfile(args.calibration, args.calibration + ".bak")
+    save_calibration(result, args.calibration)
+    print(f"Saved to {args.calibration} (previous version in {args.calibration}.bak)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,200 @@
+import json
+import math
+import os
+from typing import NamedTuple, Optional
+
+import numpy as np
+
+from config import CALIBRATION_FILE, WORKSPACE_LIMITS
+
+
+class CalibrationError(ValueError):
+    """The calibration file is missing values or puts the arm outside its workspace."""
+
+
+class Pose(NamedTuple):
+    """A TCP target of the arm: position in mm, rotation in degrees and speed."""
+    x: float
+    y: float
+    z: float
+    roll: float
+    pitch: float
+    yaw: float
+    speed: int
+
+    @classmethod
+    def from_dict(cls, data, name="pose"):
+        missing = [field for field in cls._fields if field not in data]
+        if missing:
+            raise CalibrationError(f"{name} is missing {', '.join(missing)}")
+        pose = cls(*(data[field] for field in cls._fields))
+        check_pose(pose, name)
+        return pose
+
+    def to_dict(self):
+        return self._asdict()
+
+    def with_yaw(self, yaw):
+        return self._replace(yaw=yaw)
+
+
+class NamedPoses(NamedTuple):
+    """The fixed poses of a station outside the board."""
+    default_position: Pose
+    dice_position_up: Pose
+    dice_position_down: Pose
+    dice_throw_position: Pose
+
+
+class Calibration(NamedTuple):
+    """Everything measured on a station: its fixed poses, the board's geometry and the cameras.
+
+    board holds the keyword arguments of Board apart from board_map, which is a
+    game rule and stays in GAME_CONFIG. camera, once vision.calibrate_camera has
+    run, holds the 3x3 homography from dice camera pixels to the robot's x, y;
+    board_camera, from vision.calibrate_board_camera, the one from board camera
+    pixels to board (row, col).
+    """
+    poses: NamedPoses
+    board: dict
+    camera: Optional[dict] = None
+    board_camera: Optional[dict] = None
+
+
+BOARD_KEYS = {
+    "rows": int, "cols": int, "origin": list, "pitch": list, "row_offsets": list, "serpentine": bool,
+    "up_z": (int, float), "down_z": (int, float), "orientation": list, "speed": int,
+}
+
+
+def check_pose(pose, name="pose"):
+    """Raise CalibrationError unless every value of pose is a number inside WORKSPACE_LIMITS."""
+    for field, value in zip(Pose._fields, pose):
+        if isinstance(value, bool) or not isinstance(value, (int, float)) or not math.isfinite(value):
+            raise CalibrationError(f"{name}.{field} must be a number, got {value!r}")
+        low, high = WORKSPACE_LIMITS[field]
+        if not low <= value <= high:
+            raise CalibrationError(f"{name}.{field}={value} is outside the workspace limits {low}..{high}")
+
+
+def _check_board(board):
+    unknown = sorted(set(board) - set(BOARD_KEYS) - {"field_positions"})
+    if unknown:
+        raise CalibrationError(f"board has unknown settings {', '.join(unknown)}")
+    for key, kind in BOARD_KEYS.items():
+        if key not in board:
+            raise CalibrationError(f"board is missing {key}")
+        if not isinstance(board[key], kind):
+            raise CalibrationError(f"board.{key} has the wrong type: {board[key]!r}")
+    if board["rows"] < 1 or board["cols"] < 1:
+        raise CalibrationError("board must have at least one row and one column")
+    for key, length in (("origin", 2), ("pitch", 2), ("orientation", 3), ("row_offsets", board["rows"])):
+        if len(board[key]) != length:
+            raise CalibrationError(f"board.{key} must have {length} values")
+    if board["down_z"] >= board["up_z"]:
+        raise CalibrationError("board.down_z must be below board.up_z")
+    positions = board.get("field_positions")
+    if positions is not None and len(positions) != board["rows"] * board["cols"]:
+        raise CalibrationError(f"board.field_positions must have {board['rows'] * board['cols']} entries")
+
+
+def _parse_camera(camera, name):
+    homography = camera.get("homography")
+    if (not isinstance(homography, list) or len(homography) != 3
+            or any(not isinstance(row, list) or len(row) != 3 for row in homography)):
+        raise CalibrationError(f"{name}.homography must be a 3x3 matrix")
+    values = [value for row in homography for value in row]
+    if any(isinstance(value, bool) or not isinstance(value, (int, float)) or not math.isfinite(value)
+           for value in values):
+        raise CalibrationError(f"{name}.homography must contain only numbers")
+    return {"homography": tuple(tuple(row) for row in homography)}
+
+
+def parse_calibration(data):
+    """Validate a calibration as read from JSON and compile its poses."""
+    poses = data.get("poses", {})
+    missing = [name for name in NamedPoses._fields if name not in poses]
+    if missing:
+        raise CalibrationError(f"calibration is missing the poses {', '.join(missing)}")
+    named = NamedPoses(*(Pose.from_dict(poses[name], name) for name in NamedPoses._fields))
+
+    board = dict(data.get("board", {}))
+    _check_board(board)
+    for key in ("origin", "pitch", "orientation"):
+        board[key] = tuple(board[key])
+    if board.get("field_positions") is not None:
+        board["field_positions"] = [tuple(position) for position in board["field_positions"]]
+
+    cameras = {name: _parse_camera(data[name], name) if data.get(name) is not None else None
+               for name in ("camera", "board_camera")}
+    return Calibration(named, board, **cameras)
+
+
+def load_calibration(path=CALIBRATION_FILE):
+    """Read, validate and compile a station's calibration file."""
+    try:
+        with open(path) as f:
+            data = json.load(f)
+    except (OSError, ValueError) as e:
+        raise CalibrationError(f"Cannot read calibration file {path}: {e}") from e
+    try:
+        return parse_calibration(data)
+    except CalibrationError as e:
+        raise CalibrationError(f"{path}: {e}") from e
+
+
+def fit_affine(board_points, robot_points):
+    """Least-squares 2x3 affine transform from board (row, col) to robot (x, y); needs 3 or more points."""
+    board_points = np.asarray(board_points, dtype=float)
+    robot_points = np.asarray(robot_points, dtype=float)
+    if len(board_points) < 3:
+        raise CalibrationError("An affine fit needs at least 3 reference fields")
+    design = np.column_stack([board_points, np.ones(len(board_points))])
+    if np.linalg.matrix_rank(design) < 3:
+        raise CalibrationError("The reference fields must not lie on one line")
+    solution, *_ = np.linalg.lstsq(design, robot_points, rcond=None)
+    return np.vstack([solution.T, [0.0, 0.0, 1.0]])
+
+
+def fit_homography(board_points, robot_points):
+    """3x3 projective transform from board (row, col) to robot (x, y); needs 4 or more points."""
+    board_points = np.asarray(board_points, dtype=float)
+    robot_points = np.asarray(robot_points, dtype=float)
+    if len(board_points) < 4:
+        raise CalibrationError("A homography fit needs at least 4 reference fields")
+    rows = []
+    for (u, v), (x, y) in zip(board_points, robot_points):
+        rows.append([u, v, 1, 0, 0, 0, -x * u, -x * v, -x])
+        rows.append([0, 0, 0, u, v, 1, -y * u, -y * v, -y])
+    _, singular, vt = np.linalg.svd(np.asarray(rows))
+    if singular[-2] < 1e-9 * singular[0]:
+        raise CalibrationError("The reference fields do not determine a homography")
+    matrix = vt[-1].reshape(3, 3)
+    return matrix / matrix[2, 2]
+
+
+def apply_transform(matrix, points):
+    """Map (n, 2) points through a 3x3 affine or projective matrix."""
+    points = np.asarray(points, dtype=float)
+    mapped = np.column_stack([points, np.ones(len(points))]) @ np.asarray(matrix).T
+    return mapped[:, :2] / mapped[:, 2:3]
+
+
+def save_calibration(calibration, path=CALIBRATION_FILE):
+    """Write a calibration atomically, in the format load_calibration reads."""
+    board = {key: list(value) if isinstance(value, tuple) else value for key, value in calibration.board.items()}
+    if board.get("field_positions") is not None:
+        board["field_positions"] = [list(position) for position in board["field_positions"]]
+    data = {"poses": {name: pose.to_dict() for name, pose in calibration.poses._asdict().items()}, "board": board}
+    for name in ("camera", "board_camera"):
+        camera = getattr(calibration, name)
+        if camera is not None:
+            data[name] = {"homography": [list(row) for row in camera["homography"]]}
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(data, f, indent=2)
+    os.replace(tmp_path, path)
+
+
+CALIBRATION = load_calibration()
+POSES = CALIBRATION.poses
@@ -1,5 +1,16 @@
+import clock
 from config import GAME_CONFIG
-import time
+from metrics import GRASP_RESULTS
+import profiling
+
+FEEDBACK = GAME_CONFIG["gripper_feedback"]
+
+# wait_until_stable result for a gripper that never left moving_from
+NOT_MOVED = "not_moved"
+
+
+def _print_log(message, category='robot'):
+    print(message)
 
 
 def open_gripper(client, token):
@@ -14,22 +25,78 @@ def close_gripper_figur(client, token):
     return client.set_gripper_value(token, GAME_CONFIG["gripper_closed_figur"])
 
 
-def grab_dice(client, token):
-    if not close_gripper_dice(client, token):
-        return False
-    time.sleep(1)
-    return True
+def wait_until_stable(client, token, moving_from=None, target=None, timeout=FEEDBACK["timeout"]):
+    """Poll the gripper until two readings agree. Returns the settled value, or None without feedback.
 
+    Readings still at moving_from are not taken as settled, so a gripper that has
+    not started moving yet is not mistaken for one that has stopped; if it is still
+    there at the timeout NOT_MOVED is returned. With target, only readings close to
+    it count as settled.
+    """
+    deadline = clock.now() + timeout
+    previous = None
+    with profiling.span("gripper_feedback", "motion"):
+        clock.sleep(FEEDBACK["poll_interval"])
+        while True:
+            value = client.get_gripper_value(token, pause=0)
+            if value is not None and previous is not None and abs(value - previous) <= FEEDBACK["stable_delta"]:
+                if ((moving_from is None or abs(value - moving_from) > FEEDBACK["stable_delta"])
+                        and (target is None or abs(value - target) <= FEEDBACK["stable_delta"])):
+                    return value
+            if value is not None:
+                previous = value
+            if clock.now() >= deadline:
+                if moving_from is not None and previous is not None and abs(previous - moving_from) <= FEEDBACK["stable_delta"]:
+                    return NOT_MOVED
+                return previous
+            clock.sleep(FEEDBACK["poll_interval"])
 
-def grab_figur(client, token):
-    if not close_gripper_figur(client, token):
-        return False
-    time.sleep(1)
-    return True
+
+def grasp(client, token, closed_value, log=_print_log):
+    """Close the gripper on an object and check that something is between the fingers.
+
+    With nothing to hold the fingers travel all the way to the commanded width, so a
+    settled value within empty_tolerance of it means the grasp missed. A miss is
+    retried in place, reopening and closing again before the arm moves on.
+    """
+    for attempt in range(1 + FEEDBACK["retries"]):
+        if not client.set_gripper_value(token, closed_value):
+            return False
+        value = wait_until_stable(client, token, moving_from=GAME_CONFIG["gripper_open"])
+        if value is None:
+            # No feedback from the gripper, fall back to the fixed wait
+            GRASP_RESULTS.inc(outcome="no_feedback")
+            profiling.sleep(1)
+            return True
+        if value == NOT_MOVED:
+            GRASP_RESULTS.inc(outcome="not_moved")
+            log(f"  - Gripper did not close (still at {GAME_CONFIG['gripper_open']}), grasp failed.", 'robot')
+            return False
+        if value - closed_value > FEEDBACK["empty_tolerance"]:
+            GRASP_RESULTS.inc(outcome="held")
+            return True
+
+        GRASP_RESULTS.inc(outcome="empty")
+        if attempt < FEEDBACK["retries"]:
+            log(f"  - Gripper closed on nothing (value {value}), retrying grasp...", 'robot')
+            if not release_object(client, token):
+                return False
+    log("  - Grasp failed, nothing between the gripper fingers.", 'robot')
+    return False
+
+
+def grab_dice(client, token, log=_print_log):
+    return grasp(client, token, GAME_CONFIG["gripper_closed_dice"], log)
+
+
+def grab_figur(client, token, log=_print_log):
+    return grasp(client, token, GAME_CONFIG["gripper_closed_figur"], log)
 
 
 def release_object(client, token):
     if not open_gripper(client, token):
         return False
-    time.sleep(1)
+    # Wait for the fingers to open, not for two readings taken before they start moving
+    if wait_until_stable(client, token, target=GAME_CONFIG["gripper_open"]) is None:
+        profiling.sleep(1)
     return True
@@ -1,8 +1,9 @@
-from config import GAME_CONFIG
+from config import RESUME_TCP_TOLERANCE
+from robot.calibration import POSES
 import time
 
 
-def initialize(client, token):
+def initialize(client, token, poses=POSES):
     print("Initializing robot position...")
     if client.initialize_robot(token):
         print("Robot initialized successfully.")
@@ -10,17 +11,19 @@ def initialize(client, token):
         print("Failed to initialize robot.")
     
     print("Moving robot to default position...")
-    default_pos = GAME_CONFIG["default_position"]
-    if client.set_tcp_target(
-        token,
-        default_pos["x"],
-        default_pos["y"],
-        default_pos["z"],
-        default_pos["roll"],
-        default_pos["pitch"],
-        default_pos["yaw"],
-        default_pos["speed"]
-    ):
+    if client.set_tcp_target(token, *poses.default_position):
         print("Robot moved to default position successfully.")
     else:
         print("Failed to move robot to default position.")
+
+
+def is_at_default_position(client, token, poses=POSES, tolerance=RESUME_TCP_TOLERANCE):
+    """Check whether the arm reports a position at the default position, so initialize can be skipped."""
+    state = client.get_tcp_state(token)
+    if state is None:
+        return False
+    default_pos = poses.default_position
+    x, y, z = state[:3]
+    return (abs(x - default_pos.x) <= tolerance
+            and abs(y - default_pos.y) <= tolerance
+            and abs(z - default_pos.z) <= tolerance)
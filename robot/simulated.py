@@ -0,0 +1,109 @@
+from typing import Optional, Tuple
+
+import numpy as np
+
+import clock
+import profiling
+from config import GAME_CONFIG
+from metrics import ROBOT_API_SECONDS
+from robot.calibration import POSES
+
+# How far a gripper closed on a dice or figure stays above the commanded width
+HELD_OBJECT_MARGIN = 40
+
+
+def _pose_tuple(pose):
+    return tuple(float(value) for value in pose[:6])
+
+
+class SimulatedRobotClient:
+    """Stand-in for XArmAPIClient that keeps the arm's state in memory.
+
+    Each request costs `latency` seconds plus the same pause the real client
+    makes afterwards, both on the process clock, so together with a VirtualClock
+    a whole game runs in milliseconds but is timed like the real one. Grasps miss
+    with probability grasp_miss_rate. Opening the gripper at the throw position
+    rolls the dice and reports the value to on_throw, e.g. SimulatedCamera.show.
+    """
+
+    def __init__(self, base_url="sim://robot", latency=0.15, pause=1.0, grasp_miss_rate=0.0,
+                 on_throw=None, rng=None, poses=POSES):
+        self.base_url = base_url
+        self.latency = latency
+        self.pause = pause
+        self.grasp_miss_rate = grasp_miss_rate
+        self.on_throw = on_throw
+        self.rng = rng or np.random.default_rng()
+        self.poses = poses
+
+        self.operator = None
+        self.tcp = _pose_tuple(poses.default_position)
+        self.gripper = GAME_CONFIG["gripper_open"]
+        self.requests = 0
+        self.throws = 0
+
+    def _call(self, method, endpoint, pause=None):
+        name = f"{method} {endpoint}"
+        self.requests += 1
+        with profiling.span(name, "network"):
+            clock.sleep(self.latency)
+        ROBOT_API_SECONDS.observe(self.latency, endpoint=name)
+        profiling.sleep(self.pause if pause is None else pause)
+
+    def _at(self, pose):
+        return np.allclose(self.tcp[:3], _pose_tuple(pose)[:3])
+
+    def get_operator_info(self) -> Optional[Tuple[str, str, str]]:
+        self._call("GET", "/operator")
+        return self.operator
+
+    def register_operator(self, name: str, email: str) -> Optional[str]:
+        self._call("POST", "/operator")
+        if self.operator is not None:
+            return None
+        token = f"sim-{int(self.rng.integers(1 << 30))}"
+        self.operator = (name, email, token)
+        return token
+
+    def delete_operator(self, token: str) -> bool:
+        self._call("DELETE", "/operator")
+        if self.operator is None or self.operator[2] != token:
+            return False
+        self.operator = None
+        return True
+
+    def initialize_robot(self, token: str) -> bool:
+        self._call("PUT", "/initialize")
+        self.tcp = _pose_tuple(self.poses.default_position)
+        self.gripper = GAME_CONFIG["gripper_open"]
+        return True
+
+    def get_tcp_state(self, token: str) -> Optional[Tuple[float, float, float, float, float, float]]:
+        self._call("GET", "/tcp")
+        return self.tcp
+
+    def get_target(self, token: str) -> Optional[Tuple[float, float, float, float, float, float]]:
+        self._call("GET", "/tcp/target")
+        return self.tcp
+
+    def set_tcp_target(self, token: str, x: float, y: float, z: float, roll: float, pitch: float, yaw: float, speed: int) -> bool:
+        self._call("PUT", "/tcp/target")
+        self.tcp = (float(x), float(y), float(z), float(roll), float(pitch), float(yaw))
+        return True
+
+    def set_gripper_value(self, token: str, value: int) -> bool:
+        self._call("PUT", "/gripper")
+        if value < self.gripper:
+            missed = self.rng.random() < self.grasp_miss_rate
+            self.gripper = value if missed else value + HELD_OBJECT_MARGIN
+        else:
+            if self._at(self.poses.dice_throw_position):
+                self.throws += 1
+                if self.on_throw is not None:
+                    self.on_throw(int(self.rng.integers(1, 7)))
+            self.gripper = value
+        return True
+
+    def get_gripper_value(self, token: str, pause: float = 1) -> Optional[int]:
+        self._call("GET", "/gripper", pause)
+        return self.gripper
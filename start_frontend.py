@@ -3,9 +3,15 @@ import os
 
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
-from frontend.app_frontend import app
-
 if __name__ == '__main__':
+    if "--profile-startup" in sys.argv[1:]:
+        from startup import profile_startup
+        sys.exit(0 if profile_startup("frontend.app_frontend") else 1)
+
+    from frontend.app_frontend import app, resume_interrupted_game
+    from startup import warm_imports
+
+    warm_imports()
     print("="*60)
     print("Starting Snakes & Ladders Frontend Server")
     print("="*60)
@@ -14,5 +20,8 @@ if __name__ == '__main__':
     print("\nPress Ctrl+C to stop the server")
     print("="*60 + "\n")
     
+    if resume_interrupted_game():
+        print("Resuming the games that were interrupted when the server stopped.\n")
+    
     app.run(host='0.0.0.0', port=5001, debug=False)
 
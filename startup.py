@@ -0,0 +1,164 @@
+import importlib
+import os
+import subprocess
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import clock
+from config import STARTUP_IMPORT_BUDGET, WARM_MODULES
+
+PROJECT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def warm_imports(modules=WARM_MODULES):
+    """Import modules in a background thread so they are loaded by the time they are first used.
+
+    Python's import lock makes a later import of the same module wait for this one
+    instead of loading it twice.
+    """
+    def load():
+        for name in modules:
+            try:
+                importlib.import_module(name)
+            except ImportError as e:
+                print(f"Background import of {name} failed: {e}")
+
+    thread = threading.Thread(target=load, name="warm-imports", daemon=True)
+    thread.start()
+    return thread
+
+
+class BootReport:
+    """Outcome of boot(): every step's result, duration and error."""
+
+    def __init__(self):
+        self.results = {}
+        self.seconds = {}
+        self.errors = {}
+        self.total_seconds = 0.0
+
+    def ready(self, name):
+        return name not in self.errors and bool(self.results.get(name))
+
+    def all_ready(self):
+        return all(self.ready(name) for name in self.seconds)
+
+    def format(self):
+        parts = []
+        for name, seconds in self.seconds.items():
+            if name in self.errors:
+                state = f"failed: {self.errors[name]}"
+            else:
+                state = "ready" if self.ready(name) else "not ready"
+            parts.append(f"{name} {seconds:.1f}s {state}")
+        serial = sum(self.seconds.values())
+        return (f"Boot finished in {self.total_seconds:.1f}s (serial {serial:.1f}s): "
+                + ", ".join(parts))
+
+
+def boot(steps, log=print):
+    """Run independent startup steps concurrently and wait for all of them.
+
+    steps maps a name to a callable; a step is ready if it returns a truthy
+    value. Exceptions are caught and reported, so one failing step does not
+    stop the others.
+    """
+    report = BootReport()
+    started = clock.now()
+
+    def run(name, step):
+        step_started = clock.now()
+        try:
+            report.results[name] = step()
+        except Exception as e:
+            report.errors[name] = e
+        finally:
+            report.seconds[name] = clock.now() - step_started
+
+    with ThreadPoolExecutor(max_workers=len(steps), thread_name_prefix="boot") as executor:
+        for name, step in steps.items():
+            executor.submit(run, name, step)
+    report.seconds = {name: report.seconds[name] for name in steps}
+    report.total_seconds = clock.now() - started
+    log(report.format())
+    return report
+
+
+def warm_camera(stream_url, dice_picker=None):
+    """Connect to the dice camera and run detection once, so the first robot turn starts warm.
+
+    A DicePicker's camera calibration is verified on the same frame.
+    """
+    from vision.dice_detector import warm_up
+    return warm_up(stream_url, dice_picker=dice_picker)
+
+
+def warm_tables(board):
+    """Load the win-probability table and the stored motion plans of a board."""
+    from game.markov import get_odds_table
+    from game.motion_plans import get_plan_cache
+    get_odds_table(board.board_map, board.fields)
+    get_plan_cache(board)
+    return True
+
+
+def profile_imports(module):
+    """Import module in a fresh interpreter with -X importtime.
+
+    Returns (name, self_seconds, cumulative_seconds, depth) rows in import order.
+    """
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                            capture_output=True, text=True, cwd=PROJECT_DIR)
+    if result.returncode != 0:
+        raise RuntimeError(f"Importing {module} failed:\n{result.stderr.strip()[-2000:]}")
+
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        depth = (len(name) - len(name.lstrip())) // 2
+        rows.append((name.strip(), int(self_us) / 1e6, int(cumulative_us) / 1e6, depth))
+    return rows
+
+
+def project_modules():
+    """Top-level module and package names of this project."""
+    names = set()
+    for entry in os.listdir(PROJECT_DIR):
+        path = os.path.join(PROJECT_DIR, entry)
+        if entry.endswith(".py"):
+            names.add(entry[:-3])
+        elif os.path.isdir(path) and any(name.endswith(".py") for name in os.listdir(path)):
+            names.add(entry)
+    return names
+
+
+def format_import_profile(module, rows, budget=STARTUP_IMPORT_BUDGET, top=10):
+    total = next((cumulative for name, _, cumulative, _ in rows if name == module), 0.0)
+    by_package = {}
+    for name, self_seconds, _, _ in rows:
+        package = name.split(".")[0]
+        by_package[package] = by_package.get(package, 0.0) + self_seconds
+
+    lines = [f"Import time of {module}: {total * 1000:.0f} ms (budget {budget * 1000:.0f} ms)"]
+    lines.append("  By package:")
+    for package, seconds in sorted(by_package.items(), key=lambda item: -item[1])[:top]:
+        lines.append(f"    {package}: {seconds * 1000:.1f} ms")
+    lines.append("  Project modules (cumulative):")
+    project = project_modules()
+    own = [row for row in rows if row[0].split(".")[0] in project]
+    for name, _, cumulative, _ in sorted(own, key=lambda row: -row[2])[:top]:
+        lines.append(f"    {name}: {cumulative * 1000:.1f} ms")
+    if total > budget:
+        lines.append(f"Over budget by {(total - budget) * 1000:.0f} ms")
+    return "\n".join(lines)
+
+
+def profile_startup(module, budget=STARTUP_IMPORT_BUDGET):
+    """Print the import-time breakdown of module. Returns False if it is over budget."""
+    rows = profile_imports(module)
+    print(format_import_profile(module, rows, budget))
+    total = next((cumulative for name, _, cumulative, _ in rows if name == module), 0.0)
+    return total <= budget
@@ -0,0 +1,105 @@
+import numpy as np
+
+import clock
+import profiling
+from config import BOARD_CONFIRM_TIMEOUT, BOARD_VERIFY_TIMEOUT
+from robot.calibration import apply_transform
+
+# Consecutive frames that must agree before a figure counts as in place
+STABLE_FRAMES = 3
+
+
+class BoardWatcher:
+    """Reads the figures' fields from a camera looking down on the board.
+
+    The homography maps board camera pixels to board (row, col), so a detected
+    figure is on the field whose center is nearest.
+    """
+
+    def __init__(self, camera_url, homography, board):
+        self.camera_url = camera_url
+        self.homography = np.asarray(homography, dtype=float)
+        self.board = board
+
+    def field_at(self, pixel):
+        """Return the field under an image pixel, or None if it is off the board."""
+        row, col = np.rint(apply_transform(self.homography, [pixel])[0]).astype(int)
+        if not (0 <= row < self.board.rows and 0 <= col < self.board.cols):
+            return None
+        return int(self.board.field_at[row, col])
+
+    def observe(self, frame):
+        """Return {"robot": field, "player": field} seen in a frame, None for a figure not seen."""
+        # Imported here so OpenCV is only loaded once a board camera is in use
+        from vision.figure_detector import detect_figures
+        return {name: self.field_at(center) if center is not None else None
+                for name, center in detect_figures(frame).items()}
+
+    def wait_for(self, expected, timeout=BOARD_CONFIRM_TIMEOUT):
+        """Watch the board until it shows the expected fields on STABLE_FRAMES frames in a row.
+
+        expected maps "robot" and/or "player" to a field. Returns (matched, last observation).
+        """
+        from vision.camera import get_camera
+        camera = get_camera(self.camera_url)
+        deadline = clock.now() + timeout
+        frame_id, stable, observed = 0, 0, {}
+        with profiling.span("board_check", "vision"):
+            while clock.now() < deadline:
+                frame_id, frame = camera.read(timeout=1.0, after_id=frame_id)
+                if frame is None:
+                    continue
+                observed = self.observe(frame)
+                stable = stable + 1 if all(observed.get(name) == field for name, field in expected.items()) else 0
+                if stable >= STABLE_FRAMES:
+                    return True, observed
+        return False, observed
+
+    def confirm(self, expected, log, timeout=BOARD_CONFIRM_TIMEOUT):
+        """wait_for the expected fields and log what differs if the camera does not see them."""
+        matched, observed = self.wait_for(expected, timeout)
+        if matched:
+            log("The board camera confirmed the figures' positions.", 'system')
+        else:
+            log(describe_mismatch(expected, observed), 'system')
+        return matched
+
+
+def describe_mismatch(expected, observed):
+    parts = []
+    for name, field in expected.items():
+        seen = observed.get(name)
+        if seen == field:
+            continue
+        where = f"on field {seen}" if seen is not None else "nowhere"
+        parts.append(f"the {name}'s figure should be on field {field} but the camera sees it {where}")
+    if not parts:
+        return "Board check: the camera could not see the figures steadily."
+    return "Board check: " + "; ".join(parts) + "."
+
+
+def confirm_move(watcher, expected, message, log, confirm):
+    """Ask for a figure to be moved by hand; the board camera, if any, confirms it before a human has to."""
+    if watcher is not None:
+        log(f"{message} The board camera will see when it is done.", 'system')
+        if watcher.confirm(expected, log):
+            return
+    confirm(message)
+
+
+def load_board_watcher(camera_url, calibration, board):
+    """Return the BoardWatcher of a station, or None without a board camera or its calibration."""
+    if camera_url is None or calibration.board_camera is None:
+        return None
+    return BoardWatcher(camera_url, calibration.board_camera["homography"], board)
+
+
+def verify_positions(watcher, game_state, log, timeout=BOARD_VERIFY_TIMEOUT):
+    """Check both figures against the game state; a mismatch is only reported, never fatal."""
+    if watcher is None:
+        return True
+    expected = {"robot": game_state.get_robot_position(), "player": game_state.get_player_position()}
+    matched, observed = watcher.wait_for(expected, timeout)
+    if not matched:
+        log(describe_mismatch(expected, observed), 'system')
+    return matched
@@ -0,0 +1,108 @@
+import argparse
+import shutil
+
+import numpy as np
+
+from config import BOARD_CAMERA_URL, CALIBRATION_FILE, CALIBRATION_REFERENCE_FIELDS
+from game.board import Board
+from game.game_logic import move_robot_figure, move_to_default_position
+from robot.api_client import XArmAPIClient
+from robot.calibration import CalibrationError, apply_transform, fit_homography, load_calibration, save_calibration
+from robot.movement import initialize
+from vision.camera import get_camera
+from vision.figure_detector import detect_figures
+
+# Largest fit error accepted, in fields; a figure must still land on the right field
+MAX_FIELD_RESIDUAL = 0.2
+
+
+def locate_robot_figure(camera, frames=5):
+    """Median pixel position of the robot's figure over a few frames, or None if it is not seen."""
+    centers = []
+    frame_id = 0
+    for _ in range(frames * 2):
+        frame_id, frame = camera.read(timeout=1.0, after_id=frame_id)
+        center = detect_figures(frame)["robot"] if frame is not None else None
+        if center is not None:
+            centers.append(center)
+        if len(centers) == frames:
+            break
+    return tuple(np.median(centers, axis=0)) if centers else None
+
+
+def collect_points(client, token, board, camera, fields, poses):
+    """Carry the robot's figure from field 1 over the reference fields and photograph it on each."""
+    pixels, board_points = [], []
+    current = 1
+    try:
+        for field in [1] + [f for f in fields if f != 1]:
+            if field != current:
+                print(f"\nMoving the robot's figure to field {field}...")
+                if not move_robot_figure(client, token, current, field, board=board):
+                    raise CalibrationError(f"Could not move the figure to field {field}")
+                current = field
+                move_to_default_position(client, token, poses)
+            center = locate_robot_figure(camera)
+            if center is None:
+                print(f"  Figure not seen on field {field}, skipping it")
+                continue
+            print(f"  Field {field} seen at pixel ({center[0]:.0f}, {center[1]:.0f})")
+            pixels.append(center)
+            board_points.append(board.position_of(field))
+    finally:
+        if current != 1:
+            print("\nPutting the figure back on field 1...")
+            move_robot_figure(client, token, current, 1, board=board)
+        move_to_default_position(client, token, poses)
+    return pixels, board_points
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Calibrate the board camera so the game can see where the figures are")
+    parser.add_argument("--calibration", default=CALIBRATION_FILE)
+    parser.add_argument("--camera-url", default=BOARD_CAMERA_URL, required=BOARD_CAMERA_URL is None)
+    parser.add_argument("--fields", type=int, nargs="+", default=CALIBRATION_REFERENCE_FIELDS)
+    parser.add_argument("--dry-run", action="store_true", help="Show the result without writing the file")
+    args = parser.parse_args()
+
+    calibration = load_calibration(args.calibration)
+    board = Board.from_calibration(calibration)
+    camera = get_camera(args.camera_url)
+    if not camera.wait_until_healthy(timeout=10):
+        print(f"Board camera not available ({camera.describe_health()})")
+        return
+    print("Put the robot's figure on field 1 and clear the player's figure from the board.")
+    input("Press ENTER to start...")
+
+    client = XArmAPIClient()
+    token = client.register_operator("snake.exe", "snake@mail.com")
+    if token is None:
+        print("Failed to register operator. Is another operator still registered?")
+        return
+    try:
+        initialize(client, token, calibration.poses)
+        pixels, board_points = collect_points(client, token, board, camera, args.fields, calibration.poses)
+    finally:
+        client.delete_operator(token)
+
+    try:
+        homography = fit_homography(pixels, board_points)
+    except CalibrationError as e:
+        print(f"Calibration failed: {e}")
+        return
+    residuals = np.linalg.norm(apply_transform(homography, pixels) - np.asarray(board_points, dtype=float), axis=1)
+    print(f"\nFit error over {len(pixels)} fields: max {residuals.max():.2f} fields")
+    if residuals.max() > MAX_FIELD_RESIDUAL:
+        print(f"Fit error above {MAX_FIELD_RESIDUAL} fields, not saving.")
+        return
+    if args.dry_run:
+        return
+
+    board_camera = {"homography": tuple(tuple(float(value) for value in row) for row in homography)}
+    shutil.copyfile(args.calibration, args.calibration + ".bak")
+    save_calibration(calibration._replace(board_camera=board_camera), args.calibration)
+    print(f"Saved to {args.calibration} (previous version in {args.calibration}.bak)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+import argparse
+import shutil
+
+import numpy as np
+
+from config import CALIBRATION_FILE, CALIBRATION_MAX_RESIDUAL, DICE_PICK_AREA, STREAM_URL
+from game.game_logic import carry_dice, move_to_default_position
+from robot.api_client import XArmAPIClient
+from robot.calibration import CalibrationError, apply_transform, fit_homography, load_calibration, save_calibration
+from robot.movement import initialize
+from vision.dice_detector import read_dice_from_camera
+
+
+def target_poses(rest_pose, grid=3, area=DICE_PICK_AREA, margin=20):
+    """Table poses on a grid x grid raster inside the pick area, where the dice is put down and photographed."""
+    xs = np.linspace(area["x"][0] + margin, area["x"][1] - margin, grid)
+    ys = np.linspace(area["y"][0] + margin, area["y"][1] - margin, grid)
+    return [rest_pose._replace(x=round(float(x), 1), y=round(float(y), 1)) for x in xs for y in ys]
+
+
+def collect_points(client, token, targets, poses, stream_url=STREAM_URL):
+    """Put the dice down at every target and read its pixel position. Returns (pixels, robot_xy)."""
+    pixels, robot_points = [], []
+    rest_pose = current = poses.dice_position_down
+    try:
+        for number, target in enumerate(targets, start=1):
+            print(f"\nPoint {number}/{len(targets)}: x={target.x}, y={target.y}")
+            if not carry_dice(client, token, current, target, poses.dice_position_up.z):
+                raise CalibrationError("Could not move the dice, check that it lies at its start position")
+            current = target
+            # Out of the camera's view while it looks at the dice
+            move_to_default_position(client, token, poses)
+            reading = read_dice_from_camera(wait_time=1, max_attempts=5, stream_url=stream_url)
+            if reading is None:
+                print("  Dice not seen, skipping this point")
+                continue
+            pixels.append(reading.center)
+            robot_points.append((target.x, target.y))
+    finally:
+        if current != rest_pose:
+            print("\nPutting the dice back at its start position...")
+            carry_dice(client, token, current, rest_pose, poses.dice_position_up.z)
+        move_to_default_position(client, token, poses)
+    return pixels, robot_points
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Calibrate the dice camera against the robot so it can fetch the dice")
+    parser.add_argument("--calibration", default=CALIBRATION_FILE)
+    parser.add_argument("--stream-url", default=STREAM_URL)
+    parser.add_argument("--grid", type=int, default=3, help="Points per side of the raster in the pick area")
+    parser.add_argument("--dry-run", action="store_true", help="Show the result without writing the file")
+    args = parser.parse_args()
+
+    calibration = load_calibration(args.calibration)
+    rest_pose = calibration.poses.dice_position_down
+    print("Put the dice at its start position. The robot will place it on "
+          f"{args.grid * args.grid} points and photograph it.")
+    input("Press ENTER to start...")
+
+    client = XArmAPIClient()
+    token = client.register_operator("snake.exe", "snake@mail.com")
+    if token is None:
+        print("Failed to register operator. Is another operator still registered?")
+        return
+    try:
+        initialize(client, token, calibration.poses)
+        pixels, robot_points = collect_points(client, token, target_poses(rest_pose, args.grid), calibration.poses,
+                                              args.stream_url)
+    finally:
+        client.delete_operator(token)
+
+    try:
+        homography = fit_homography(pixels, robot_points)
+    except CalibrationError as e:
+        print(f"Calibration failed: {e}")
+        return
+    residuals = np.linalg.norm(apply_transform(homography, pixels) - np.asarray(robot_points), axis=1)
+    print(f"\nFit error over {len(pixels)} points: mean {residuals.mean():.1f} mm, max {residuals.max():.1f} mm")
+    if residuals.max() > CALIBRATION_MAX_RESIDUAL:
+        print(f"Fit error above {CALIBRATION_MAX_RESIDUAL} mm, not saving.")
+        return
+    if args.dry_run:
+        return
+
+    camera = {"homography": tuple(tuple(float(value) for value in row) for row in homography)}
+    shutil.copyfile(args.calibration, args.calibration + ".bak")
+    save_calibration(calibration._replace(camera=camera), args.calibration)
+    print(f"Saved to {args.calibration} (previous version in {args.calibration}.bak)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,194 @@
+import threading
+import time
+from collections import deque
+
+import cv2
+
+
+class CameraSupervisor:
+    """Keeps a camera stream open in a background thread and reconnects with backoff when it drops."""
+
+    def __init__(self, url, width=1280, height=720, min_backoff=0.5, max_backoff=10.0,
+                 max_read_failures=10, stale_after=2.0):
+        self.url = url
+        self.width = width
+        self.height = height
+        self.min_backoff = min_backoff
+        self.max_backoff = max_backoff
+        self.max_read_failures = max_read_failures
+        self.stale_after = stale_after
+
+        self._condition = threading.Condition()
+        self._thread = None
+        self._running = False
+
+        self._frame = None
+        self._frame_id = 0
+        self._last_frame_time = None
+        self._frame_times = deque(maxlen=30)
+
+        self.connected = False
+        self.reconnects = 0
+        self.dropped_frames = 0
+        self.decode_latency = None
+
+    def start(self):
+        with self._condition:
+            if self._running:
+                return
+            self._running = True
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        with self._condition:
+            self._running = False
+            self._condition.notify_all()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    def _open(self):
+        cap = cv2.VideoCapture(self.url)
+        if not cap.isOpened():
+            cap.release()
+            return None
+        cap.set(cv2.CAP_PROP_FRAME_WIDTH, self.width)
+        cap.set(cv2.CAP_PROP_FRAME_HEIGHT, self.height)
+        return cap
+
+    def _run(self):
+        backoff = self.min_backoff
+        while self._running:
+            cap = self._open()
+            if cap is None:
+                print(f"Camera stream unavailable, retrying in {backoff:.1f}s...")
+                self._set_connected(False)
+                time.sleep(backoff)
+                backoff = min(backoff * 2, self.max_backoff)
+                continue
+
+            backoff = self.min_backoff
+            self._set_connected(True)
+            failures = 0
+
+            while self._running and failures < self.max_read_failures:
+                started = time.perf_counter()
+                ret, frame = cap.read()
+                latency = time.perf_counter() - started
+
+                if not ret or frame is None:
+                    failures += 1
+                    with self._condition:
+                        self.dropped_frames += 1
+                    time.sleep(0.05)
+                    continue
+
+                failures = 0
+                now = time.monotonic()
+                with self._condition:
+                    self._frame = frame
+                    self._frame_id += 1
+                    self._last_frame_time = now
+                    self._frame_times.append(now)
+                    self.decode_latency = latency
+                    self._condition.notify_all()
+
+            cap.release()
+            self._set_connected(False)
+            if self._running:
+                print("Camera stream lost, reconnecting...")
+                with self._condition:
+                    self.reconnects += 1
+
+    def _set_connected(self, connected):
+        with self._condition:
+            self.connected = connected
+            self._condition.notify_all()
+
+    def read(self, timeout=1.0, after_id=0):
+        """Return (frame_id, frame) for the first frame newer than after_id, or (after_id, None) on timeout."""
+        deadline = time.monotonic() + timeout
+        with self._condition:
+            while self._frame_id <= after_id:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0 or not self._running:
+                    return after_id, None
+                self._condition.wait(remaining)
+            return self._frame_id, self._frame
+
+    def seconds_since_last_frame(self):
+        with self._condition:
+            if self._last_frame_time is None:
+                return None
+            return time.monotonic() - self._last_frame_time
+
+    def fps(self):
+        with self._condition:
+            if len(self._frame_times) < 2:
+                return 0.0
+            span = self._frame_times[-1] - self._frame_times[0]
+            if span <= 0:
+                return 0.0
+            return (len(self._frame_times) - 1) / span
+
+    def is_healthy(self):
+        age = self.seconds_since_last_frame()
+        return self.connected and age is not None and age <= self.stale_after
+
+    def health(self):
+        with self._condition:
+            age = self.seconds_since_last_frame()
+            latency = self.decode_latency
+            return {
+                "healthy": self.connected and age is not None and age <= self.stale_after,
+                "connected": self.connected,
+                "fps": round(self.fps(), 1),
+                "decode_latency_ms": round(latency * 1000, 1) if latency is not None else None,
+                "dropped_frames": self.dropped_frames,
+                "reconnects": self.reconnects,
+                "seconds_since_last_frame": round(age, 2) if age is not None else None,
+            }
+
+    def describe_health(self):
+        h = self.health()
+        age = h["seconds_since_last_frame"]
+        age_text = "never" if age is None else f"{age:.1f}s ago"
+        latency = h["decode_latency_ms"]
+        latency_text = "n/a" if latency is None else f"{latency}ms"
+        return (f"connected={h['connected']}, fps={h['fps']}, "
+                f"decode={latency_text}, dropped={h['dropped_frames']}, "
+                f"reconnects={h['reconnects']}, last frame {age_text}")
+
+    def wait_until_healthy(self, timeout=10.0):
+        """Block until a fresh frame arrives or the timeout expires. Returns True if the stream is healthy."""
+        self.start()
+        deadline = time.monotonic() + timeout
+        while not self.is_healthy():
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return False
+            with self._condition:
+                self._condition.wait(min(remaining, 0.2))
+        return True
+
+
+_cameras = {}
+_cameras_lock = threading.Lock()
+
+
+def get_camera(url):
+    """Return the shared, already started supervisor for a stream URL."""
+    with _cameras_lock:
+        camera = _cameras.get(url)
+        if camera is None:
+            camera = CameraSupervisor(url)
+            _cameras[url] = camera
+    camera.start()
+    return camera
+
+
+def register_camera(url, camera):
+    """Serve a stream URL from another frame source, e.g. a simulated camera."""
+    with _cameras_lock:
+        _cameras[url] = camera
@@ -1,8 +1,17 @@
 import cv2
 import numpy as np
-import time
+from typing import NamedTuple, Tuple
+
+import profiling
+from config import STREAM_URL
+from metrics import DICE_CONFIDENCE, DICE_DETECTION_FAILURES, DICE_FRAMES_USED
+from vision.camera import get_camera
+
+class DiceReading(NamedTuple):
+    value: int
+    center: Tuple[float, float]   # pixel position of the dice in the camera image
+    confidence: float
 
-STREAM_URL = "https://interactions.ics.unisg.ch/61-102/cam2/live-stream"
 
 LOWER_PINK = np.array([145, 20, 130])
 UPPER_PINK = np.array([180, 100, 255])
@@ -146,31 +155,68 @@ def read_dice_value(roi, debug=False):
     return pip_count
 
 
-def get_dice_value_from_camera(wait_time=3, max_attempts=5, display_video=False):
-    cap = cv2.VideoCapture(STREAM_URL)
-    if not cap.isOpened():
-        print("Error: Cannot access camera stream")
+def warm_up(stream_url=STREAM_URL, connect_timeout=10, dice_picker=None):
+    """Open the stream and detect once on its first frame, so the first turn pays neither cost.
+
+    With a DicePicker the dice, which should lie at its start position, is used to
+    verify the camera calibration. Returns the stream's health description, or
+    None if no frame arrived.
+    """
+    camera = get_camera(stream_url)
+    if not camera.wait_until_healthy(timeout=connect_timeout):
+        print(f"Camera stream not ready ({camera.describe_health()})")
+        return None
+    _, frame = camera.read(timeout=1.0)
+    if frame is None:
+        return None
+    dices, _ = detect_dice(frame)
+    if dice_picker is not None:
+        if len(dices) == 1:
+            error = dice_picker.verify(dices[0]["center"])
+            state = "verified" if dice_picker.verified else "disabled, recalibrate the camera"
+            print(f"Camera calibration places the dice {error:.1f}mm from its start position ({state})")
+        else:
+            print("Camera calibration not verified, the dice is left to a human: "
+                  "put the dice at its start position before starting")
+    return camera.describe_health()
+
+
+def get_dice_value_from_camera(wait_time=3, max_attempts=5, display_video=False, connect_timeout=10, stream_url=STREAM_URL):
+    reading = read_dice_from_camera(wait_time, max_attempts, display_video, connect_timeout, stream_url)
+    return reading.value if reading is not None else None
+
+
+def read_dice_from_camera(wait_time=3, max_attempts=5, display_video=False, connect_timeout=10, stream_url=STREAM_URL):
+    """Detect the dice over several frames. Returns a DiceReading of the majority value, or None."""
+    camera = get_camera(stream_url)
+    if not camera.wait_until_healthy(timeout=connect_timeout):
+        print(f"Error: Cannot access camera stream ({camera.describe_health()})")
+        DICE_DETECTION_FAILURES.inc()
         return None
-    
-    cap.set(cv2.CAP_PROP_FRAME_WIDTH, 1280)
-    cap.set(cv2.CAP_PROP_FRAME_HEIGHT, 720)
     
     print(f"Waiting {wait_time} seconds for dice to settle...")
-    time.sleep(wait_time)
+    profiling.sleep(wait_time)
     
     detected_values = []
+    centers = []
+    frames_used = 0
+    frame_id = 0
     
     print("Detecting dice value...")
     for attempt in range(max_attempts):
-        ret, frame = cap.read()
-        if not ret:
+        with profiling.span("camera_read", "vision"):
+            frame_id, frame = camera.read(timeout=1.0, after_id=frame_id)
+        if frame is None:
             print(f"  Warning: Could not read frame (attempt {attempt + 1})")
-            time.sleep(0.5)
+            profiling.sleep(0.5)
             continue
         
-        dices, mask = detect_dice(frame, debug=display_video)
+        frames_used += 1
+        with profiling.span("detect_dice", "vision"):
+            dices, mask = detect_dice(frame, debug=display_video)
         
         if display_video:
+            frame = frame.copy()
             for dice in dices:
                 x, y, w, h = dice["bbox"]
                 value = dice["value"]
@@ -182,6 +228,7 @@ def get_dice_value_from_camera(wait_time=3, max_attempts=5, display_video=False)
         
         if len(dices) == 1 and 1 <= dices[0]["value"] <= 6:
             detected_values.append(dices[0]["value"])
+            centers.append(dices[0]["center"])
             print(f"  Attempt {attempt + 1}: Detected value {dices[0]['value']}")
         else:
             if len(dices) == 0:
@@ -191,23 +238,26 @@ def get_dice_value_from_camera(wait_time=3, max_attempts=5, display_video=False)
             else:
                 print(f"  Attempt {attempt + 1}: Invalid value {dices[0]['value']}")
         
-        time.sleep(0.3)
+        profiling.sleep(0.3)
     
-    cap.release()
     if display_video:
         cv2.destroyAllWindows()
     
+    DICE_FRAMES_USED.observe(frames_used)
     if not detected_values:
         print("Error: Could not detect valid dice value")
+        DICE_DETECTION_FAILURES.inc()
         return None
     
     from collections import Counter
     most_common = Counter(detected_values).most_common(1)[0]
     final_value = most_common[0]
     confidence = most_common[1] / len(detected_values)
+    DICE_CONFIDENCE.observe(confidence)
     
     print(f"Final detected value: {final_value} (confidence: {confidence:.1%})")
-    return final_value
+    center = np.median([c for c, v in zip(centers, detected_values) if v == final_value], axis=0)
+    return DiceReading(final_value, (float(center[0]), float(center[1])), confidence)
 
 
 
@@ -0,0 +1,28 @@
+import cv2
+import numpy as np
+
+from config import FIGURE_HSV_RANGES
+
+# Blobs smaller than this (pixels) are noise, not a figure
+MIN_FIGURE_AREA = 150
+
+
+def detect_figures(frame, ranges=FIGURE_HSV_RANGES, min_area=MIN_FIGURE_AREA):
+    """Find each figure by its color. Returns {name: (cx, cy)} of the largest blob per color, None if unseen."""
+    if frame is None or frame.size == 0:
+        return {name: None for name in ranges}
+
+    hsv = cv2.cvtColor(cv2.GaussianBlur(frame, (5, 5), 0), cv2.COLOR_BGR2HSV)
+    kernel = np.ones((3, 3), np.uint8)
+    figures = {}
+    for name, (lower, upper) in ranges.items():
+        mask = cv2.inRange(hsv, np.array(lower), np.array(upper))
+        mask = cv2.morphologyEx(mask, cv2.MORPH_OPEN, kernel, iterations=2)
+        contours, _ = cv2.findContours(mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+        largest = max(contours, key=cv2.contourArea, default=None)
+        if largest is None or cv2.contourArea(largest) < min_area:
+            figures[name] = None
+            continue
+        moments = cv2.moments(largest)
+        figures[name] = (moments["m10"] / moments["m00"], moments["m01"] / moments["m00"])
+    return figures
@@ -0,0 +1,53 @@
+import numpy as np
+
+from config import DICE_PICK_AREA, DICE_PICK_TOLERANCE
+from robot.calibration import CALIBRATION, POSES, apply_transform
+
+
+class DicePicker:
+    """Turns the pixel where the camera saw the dice into the poses to pick it up from.
+
+    verified is None until verify() has compared the calibration against the dice
+    at its start position; only a calibration that passed that check is used.
+    """
+
+    def __init__(self, homography, area=DICE_PICK_AREA, rest_pose=None, lift_z=None):
+        self.homography = np.asarray(homography, dtype=float)
+        self.area = area
+        self.rest_pose = rest_pose or POSES.dice_position_down
+        self.lift_z = lift_z if lift_z is not None else POSES.dice_position_up.z
+        self.verified = None
+
+    @property
+    def usable(self):
+        return self.verified is True
+
+    def locate(self, center):
+        """Return the robot (x, y) of an image pixel on the table."""
+        x, y = apply_transform(self.homography, [center])[0]
+        return float(x), float(y)
+
+    def pick_poses(self, center):
+        """Return the (up, down) poses above and at the dice, or None if it lies outside the pick area."""
+        if not self.usable:
+            return None
+        x, y = self.locate(center)
+        if not (self.area["x"][0] <= x <= self.area["x"][1] and self.area["y"][0] <= y <= self.area["y"][1]):
+            return None
+        down = self.rest_pose._replace(x=round(x, 1), y=round(y, 1))
+        return down._replace(z=self.lift_z), down
+
+    def verify(self, center, tolerance=DICE_PICK_TOLERANCE):
+        """Check the calibration with the dice seen at its start position. Returns the error in mm."""
+        x, y = self.locate(center)
+        error = float(np.hypot(x - self.rest_pose.x, y - self.rest_pose.y))
+        self.verified = error <= tolerance
+        return error
+
+
+def load_dice_picker(calibration=CALIBRATION):
+    """Return the DicePicker of a station's calibration, or None if its camera is not calibrated."""
+    if calibration.camera is None:
+        return None
+    return DicePicker(calibration.camera["homography"], rest_pose=calibration.poses.dice_position_down,
+                      lift_z=calibration.poses.dice_position_up.z)
@@ -0,0 +1,122 @@
+import os
+
+import cv2
+import numpy as np
+
+import clock
+from vision.camera import register_camera
+
+# Pip offsets in quarters of the dice size, matching a real dice face
+PIP_LAYOUT = {
+    1: [(0, 0)],
+    2: [(-1, -1), (1, 1)],
+    3: [(-1, -1), (0, 0), (1, 1)],
+    4: [(-1, -1), (1, -1), (-1, 1), (1, 1)],
+    5: [(-1, -1), (1, -1), (0, 0), (-1, 1), (1, 1)],
+    6: [(-1, -1), (1, -1), (-1, 0), (1, 0), (-1, 1), (1, 1)],
+}
+
+# Pink within the detector's HSV range, converted once to BGR
+DICE_COLOR = cv2.cvtColor(np.uint8([[[165, 60, 220]]]), cv2.COLOR_HSV2BGR)[0, 0].tolist()
+PIP_COLOR = (40, 30, 40)
+TABLE_COLOR = (90, 110, 90)
+
+
+def render_dice_frame(value, center=(320, 240), size=70, shape=(480, 640)):
+    """Draw a top-down view of one dice showing value, readable by detect_dice."""
+    frame = np.full(shape + (3,), TABLE_COLOR, dtype=np.uint8)
+    cx, cy = center
+    half = size // 2
+    cv2.rectangle(frame, (cx - half, cy - half), (cx + half, cy + half), DICE_COLOR, -1)
+    for dx, dy in PIP_LAYOUT[value]:
+        cv2.circle(frame, (cx + dx * size // 4, cy + dy * size // 4), size // 12, PIP_COLOR, -1)
+    return frame
+
+
+class SimulatedCamera:
+    """Frame source with the CameraSupervisor interface that shows a rendered dice.
+
+    Every read returns a new frame and advances the clock by one frame interval,
+    so detection costs the same virtual time as against the real stream.
+    """
+
+    def __init__(self, url="sim://camera", fps=15.0, value=1, rng=None):
+        self.url = url
+        self.frame_interval = 1.0 / fps
+        self.rng = rng or np.random.default_rng()
+        self._frame_id = 0
+        self.show(value)
+
+    def show(self, value):
+        """Put the dice down showing value somewhere near the middle of the view."""
+        self.value = value
+        center = (320 + int(self.rng.integers(-120, 121)), 240 + int(self.rng.integers(-80, 81)))
+        self._frame = render_dice_frame(value, center)
+
+    def install(self):
+        register_camera(self.url, self)
+        return self
+
+    def start(self):
+        pass
+
+    def stop(self):
+        pass
+
+    def read(self, timeout=1.0, after_id=0):
+        clock.sleep(self.frame_interval)
+        self._frame_id = max(self._frame_id, after_id) + 1
+        return self._frame_id, self._frame
+
+    def seconds_since_last_frame(self):
+        return 0.0
+
+    def fps(self):
+        return 1.0 / self.frame_interval
+
+    def is_healthy(self):
+        return True
+
+    def health(self):
+        return {"healthy": True, "connected": True, "fps": round(self.fps(), 1), "decode_latency_ms": 0.0,
+                "dropped_frames": 0, "reconnects": 0, "seconds_since_last_frame": 0.0}
+
+    def describe_health(self):
+        return f"simulated, fps={self.fps():.1f}"
+
+    def wait_until_healthy(self, timeout=10.0):
+        return True
+
+
+class RecordedCamera(SimulatedCamera):
+    """SimulatedCamera that shows frames recorded from the real dice camera.
+
+    The directory holds images named <value>_<anything>.png or .jpg; show(value)
+    picks one of the recordings of that value at random.
+    """
+
+    def __init__(self, directory, url="sim://recorded-camera", fps=15.0, value=1, rng=None):
+        self.frames = load_recorded_frames(directory)
+        missing = sorted(set(PIP_LAYOUT) - set(self.frames))
+        if missing:
+            raise ValueError(f"No recorded frames for dice values {missing} in {directory}")
+        super().__init__(url, fps, value, rng)
+
+    def show(self, value):
+        self.value = value
+        recordings = self.frames[value]
+        self._frame = recordings[int(self.rng.integers(len(recordings)))]
+
+
+def load_recorded_frames(directory):
+    """Read <value>_*.png/.jpg files from directory into {value: [frame, ...]}."""
+    frames = {}
+    for name in sorted(os.listdir(directory)):
+        stem, ext = os.path.splitext(name)
+        value = stem.split("_", 1)[0]
+        if ext.lower() not in (".png", ".jpg", ".jpeg") or not value.isdigit():
+            continue
+        frame = cv2.imread(os.path.join(directory, name))
+        if frame is not None:
+            frames.setdefault(int(value), []).append(frame)
+    return frames